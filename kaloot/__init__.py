@@ -1,13 +1,41 @@
-from . import (
-    calendar,
-    custody,
-    date,
-    event,
-    feature,
-    html,
-    io,
-)
+"""kaloot - Custody calendar generator.
+
+Submodules are imported on first access, e.g. ``kaloot.html``, so that commands
+which only need part of the package do not pay for the Jinja, YAML and markdown
+imports.
+"""
 
-from .html import MasterCalendar
+import importlib
+
+_SUBMODULES = frozenset(
+    [
+        "batch",
+        "cache",
+        "calendar",
+        "config",
+        "custody",
+        "date",
+        "event",
+        "feature",
+        "html",
+        "io",
+        "rules",
+        "site",
+        "stats",
+        "watch",
+    ]
+)
 
 __all__ = ["MasterCalendar"]
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name == "MasterCalendar":
+        return importlib.import_module(".html", __name__).MasterCalendar
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _SUBMODULES | set(__all__))
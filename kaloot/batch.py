@@ -0,0 +1,144 @@
+"""kaloot.batch - Generates many calendars in a single process.
+
+Calendars generated in the same process share the Jinja environments, the public
+holidays and the year tables. Worker processes keep these caches between calendars.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import os
+import pathlib
+import time
+from typing import Iterable, Optional
+
+from .cache import FragmentCache
+from .html import HTMLConfiguration, create_calendar
+from .io import read_configuration_file, write_html
+
+
+@dataclass
+class BatchResult:
+    """Stores the outcome of the generation of one calendar."""
+
+    config_path: pathlib.Path
+    output_path: Optional[pathlib.Path] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """``True`` if the calendar was generated, ``False`` otherwise."""
+        return self.error is None
+
+
+@dataclass
+class BatchReport:
+    """Stores the outcome of a batch generation."""
+
+    results: list[BatchResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> list[BatchResult]:
+        """The results of the calendars that were generated."""
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list[BatchResult]:
+        """The results of the calendars that could not be generated."""
+        return [result for result in self.results if not result.ok]
+
+    def throughput(self) -> float:
+        """Returns the number of calendars generated per second."""
+        if self.seconds == 0:
+            return 0.0
+        return len(self.succeeded) / self.seconds
+
+    def summary(self) -> str:
+        """Returns a one line summary of the batch."""
+        return (
+            f"{len(self.succeeded)} calendars generated, {len(self.failed)} failed"
+            f" in {self.seconds:.2f} s ({self.throughput():.1f} calendars/s)"
+        )
+
+
+def output_path_for(config_path: os.PathLike, output_dir: os.PathLike) -> pathlib.Path:
+    """Returns the path of the calendar generated from a configuration file."""
+    return pathlib.Path(output_dir) / f"{pathlib.Path(config_path).stem}.html"
+
+
+def generate_calendar(
+    config_path: os.PathLike,
+    output_path: os.PathLike,
+    html_config: Optional[HTMLConfiguration] = None,
+    cache_dir: Optional[os.PathLike] = None,
+) -> BatchResult:
+    """Generates the calendar of a configuration file.
+
+    Errors are reported in the result instead of being raised.
+    With a ``cache_dir``, the parsed configuration and the rendered fragments of
+    previous runs are reused.
+    """
+    start = time.perf_counter()
+    result = BatchResult(pathlib.Path(config_path))
+    try:
+        config = read_configuration_file(config_path, cache_dir)
+        fragment_cache = FragmentCache(cache_dir) if cache_dir is not None else None
+        cal = create_calendar(config, html_config, fragment_cache)
+        write_html(output_path, cal.generate())
+        result.output_path = pathlib.Path(output_path)
+    except Exception as exc:  # pylint: disable=broad-except  # reported per config
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def run_batch(
+    config_paths: Iterable[os.PathLike],
+    output_dir: os.PathLike,
+    html_config: Optional[HTMLConfiguration] = None,
+    jobs: int = 1,
+    cache_dir: Optional[os.PathLike] = None,
+) -> BatchReport:
+    """Generates the calendar of every configuration file into ``output_dir``.
+
+    Each calendar is written to ``<output_dir>/<config file stem>.html``.
+    With ``jobs`` greater than 1, calendars are generated by that many processes.
+    Results are in the same order as ``config_paths``.
+
+    Raises a ``ValueError`` if two configuration files have the same stem, since
+    their calendars would overwrite each other.
+    """
+    config_paths = [pathlib.Path(path) for path in config_paths]
+    output_paths = [output_path_for(path, output_dir) for path in config_paths]
+    configs_by_output: dict[pathlib.Path, pathlib.Path] = {}
+    for config_path, output_path in zip(config_paths, output_paths):
+        other = configs_by_output.setdefault(output_path, config_path)
+        if other is not config_path:
+            raise ValueError(
+                f"{other} and {config_path} would both be written to {output_path}"
+            )
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    if jobs > 1:
+        import concurrent.futures  # pylint: disable=import-outside-toplevel
+
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            results = list(
+                executor.map(
+                    generate_calendar,
+                    config_paths,
+                    output_paths,
+                    [html_config] * len(config_paths),
+                    [cache_dir] * len(config_paths),
+                    chunksize=max(1, len(config_paths) // (4 * jobs)),
+                )
+            )
+    else:
+        results = [
+            generate_calendar(config_path, output_path, html_config, cache_dir)
+            for config_path, output_path in zip(config_paths, output_paths)
+        ]
+    return BatchReport(results, time.perf_counter() - start)
@@ -0,0 +1,166 @@
+"""kaloot.cache - Content-addressed cache of rendered HTML fragments.
+
+Fragments, e.g. the months and the legend of a calendar, are stored under the hash
+of everything their HTML depends on: the library source code, the templates, the
+HTML configuration and the data shown in the fragment. A fragment whose inputs did
+not change since the previous build is read from the cache instead of being
+rendered again.
+
+The cache is pruned when fragments are written: fragments unused for ``max_age``
+seconds are removed, then the least recently used ones until the cache holds at
+most ``max_bytes``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import functools
+import hashlib
+import os
+import pathlib
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    import jinja2
+
+# Help of the command line option giving the cache directory.
+CACHE_DIR_HELP = (
+    "Reuse the configurations parsed and the months and legend rendered by"
+    " previous runs, stored in this directory"
+)
+
+
+def digest(*parts: object) -> str:
+    """Returns the SHA-256 hex digest of the ``str`` of each part."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(str(part).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+@functools.cache
+def library_digest() -> str:
+    """Returns the digest of the kaloot source code.
+
+    Any change to the library invalidates the fragments rendered by a previous version.
+    """
+    hasher = hashlib.sha256()
+    for path in sorted(pathlib.Path(__file__).parent.glob("*.py")):
+        hasher.update(path.name.encode("utf-8"))
+        hasher.update(path.read_bytes())
+    return hasher.hexdigest()
+
+
+def templates_digest(env: jinja2.Environment) -> str:
+    """Returns the digest of the source of every template of a Jinja environment."""
+    hasher = hashlib.sha256()
+    for name in env.list_templates():
+        source, _, _ = env.loader.get_source(env, name)
+        hasher.update(name.encode("utf-8"))
+        hasher.update(source.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+# Default limits of a ``FragmentCache``: 32 MiB, fragments unused for 30 days.
+MAX_BYTES = 32 * 1024 * 1024
+MAX_AGE = 30 * 24 * 3600
+
+
+@dataclass
+class FragmentCache:
+    """Stores rendered HTML fragments in ``directory``, by key.
+
+    Fragments are also kept in memory, so a long-lived process reads each one from
+    disk at most once. ``hits`` and ``misses`` count the lookups since creation.
+
+    The modification time of a fragment file is its last use. The cache is pruned
+    on the first write, then each time a quarter of ``max_bytes`` was written.
+    """
+
+    directory: pathlib.Path
+    hits: int = 0
+    misses: int = 0
+    max_bytes: int = MAX_BYTES
+    max_age: float = MAX_AGE
+    _fragments: dict[str, str] = field(default_factory=dict, repr=False)
+    # Number of bytes written since the cache was last pruned, None before.
+    _written: Optional[int] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        self.directory = pathlib.Path(self.directory)
+
+    def path(self, key: str) -> pathlib.Path:
+        """Returns the path of the fragment stored under ``key``."""
+        return self.directory / key[:2] / f"{key}.html"
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the fragment stored under ``key``, ``None`` if there is none."""
+        if key in self._fragments:
+            return self._fragments[key]
+        path = self.path(key)
+        try:
+            html = path.read_text(encoding="utf-8")
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        self._fragments[key] = html
+        return html
+
+    def put(self, key: str, html: str):
+        """Stores a fragment under ``key``.
+
+        The file is written under a temporary name and renamed, so concurrent
+        builds never read a partial fragment.
+        """
+        self._fragments[key] = html
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        data = html.encode("utf-8")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        if self._written is None or self._written >= self.max_bytes // 4:
+            self.prune()
+        self._written = (self._written or 0) + len(data)
+
+    def prune(self):
+        """Removes the fragments unused for ``max_age`` seconds.
+
+        The least recently used fragments are then removed until the cache holds at
+        most ``max_bytes``.
+        """
+        self._written = 0
+        fragments = []
+        for path in self.directory.glob("*/*.html"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # removed by a concurrent build
+                continue
+            fragments.append((stat.st_mtime, stat.st_size, path))
+        fragments.sort(reverse=True)
+        oldest = time.time() - self.max_age
+        total = 0
+        for mtime, size, path in fragments:
+            total += size
+            if mtime < oldest or total > self.max_bytes:
+                path.unlink(missing_ok=True)
+                self._fragments.pop(path.stem, None)
+
+    def get_or_render(self, key: str, render: Callable[[], str]) -> str:
+        """Returns the fragment stored under ``key``, rendering and storing it if needed."""
+        html = self.get(key)
+        if html is not None:
+            self.hits += 1
+            return html
+        self.misses += 1
+        html = render()
+        self.put(key, html)
+        return html
+
+    def clear(self):
+        """Removes every fragment from the cache."""
+        self._fragments.clear()
+        for path in self.directory.glob("*/*.html"):
+            path.unlink()
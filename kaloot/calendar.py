@@ -1,12 +1,18 @@
-"""kaloot.calendar - Provides generic the ``Calendar`` class.
+"""kaloot.calendar - Provides generic the ``Calendar`` and ``YearTable`` classes.
 
 The ``Calendar`` class provides additional generic calendar helper functions
 over ``calendar.Calendar``.
+
+The ``YearTable`` class stores precomputed calendar attributes for every day of a year.
 """
 
+from __future__ import annotations
+
+import array
 import calendar
 from dataclasses import dataclass, field
 import datetime
+import functools
 from typing import Iterator
 
 from .date import current_year, date, pentecote
@@ -16,19 +22,21 @@ from .date import current_year, date, pentecote
 class Calendar:
     """Calendar class provides generic calendar helper functions."""
 
-    year: int = current_year()
+    year: int = field(default_factory=current_year)
     _cal: calendar.Calendar = field(init=False, repr=False, default=calendar.Calendar())
 
     def iter_month_weeks(self, month: int) -> Iterator[list[date]]:
         """Iterates over a month weeks."""
-        for week in self._cal.monthdatescalendar(self.year, month):
-            yield [date.from_date(d) for d in week if d.month == month]
+        first = datetime.date(self.year, month, 1).toordinal() - 1
+        for week in self._cal.monthdayscalendar(self.year, month):
+            yield [date.fromordinal(first + day) for day in week if day]
 
     def iter_month_dates(self, month: int) -> Iterator[date]:
         """Iterates over a month dates."""
-        for day in self._cal.itermonthdates(self.year, month):
-            if day.month == month:
-                yield date(day.year, day.month, day.day)
+        first = datetime.date(self.year, month, 1).toordinal() - 1
+        for day in self._cal.itermonthdays(self.year, month):
+            if day:
+                yield date.fromordinal(first + day)
 
     def month_sundays(self, month: int) -> list[date]:
         """Returns all Sundays for a given month."""
@@ -50,3 +58,80 @@ class Calendar:
         Father's day is the 3rd Sunday of June.
         """
         return self.month_sundays(6)[2]
+
+
+@functools.cache
+def mothers_day(year: int) -> date:
+    """Returns the day of Mother's day of a year."""
+    return Calendar(year).mothers_day()
+
+
+@functools.cache
+def fathers_day(year: int) -> date:
+    """Returns the day of Father's day of a year."""
+    return Calendar(year).fathers_day()
+
+
+@dataclass(frozen=True)
+class YearTable:
+    """Stores calendar attributes for every day of a year.
+
+    Attributes are stored in compact arrays indexed by the day of the year,
+    starting at 0 for the 1st of January: the weekday (0 for Monday), the ISO week
+    number and its parity (0 for even weeks, 1 for odd weeks).
+    """
+
+    year: int
+    first_ordinal: int
+    weekday: array.array = field(repr=False)
+    week: array.array = field(repr=False)
+    parity: array.array = field(repr=False)
+
+    @classmethod
+    def of(cls, year: int) -> YearTable:
+        """Returns the table for a year, shared between all callers."""
+        return year_table(year)
+
+    @classmethod
+    def build(cls, year: int) -> YearTable:
+        """Computes the table for a year."""
+        first_ordinal = datetime.date(year, 1, 1).toordinal()
+        weekday, week, parity = (array.array("B") for _ in range(3))
+        for ordinal in range(
+            first_ordinal, datetime.date(year, 12, 31).toordinal() + 1
+        ):
+            the_date = datetime.date.fromordinal(ordinal)
+            week_number = the_date.isocalendar()[1]
+            weekday.append(the_date.weekday())
+            week.append(week_number)
+            parity.append(week_number & 1)
+        return cls(year, first_ordinal, weekday, week, parity)
+
+    def __len__(self) -> int:
+        """Returns the number of days in the year."""
+        return len(self.weekday)
+
+    def index(self, day: datetime.date) -> int:
+        """Returns the index of a date in the table."""
+        index = day.toordinal() - self.first_ordinal
+        if not 0 <= index < len(self):
+            raise IndexError(f"{day}: not in {self.year}")
+        return index
+
+    def date(self, index: int) -> date:
+        """Returns the date at a given index."""
+        return date.fromordinal(self.first_ordinal + index)
+
+    def is_even_week(self, index: int) -> bool:
+        """Returns ``True`` if the day at index is in an even week, ``False`` otherwise."""
+        return not self.parity[index]
+
+    def is_weekend(self, index: int) -> bool:
+        """Returns ``True`` if the day at index is a weekend day, ``False`` otherwise."""
+        return self.weekday[index] > 4
+
+
+@functools.cache
+def year_table(year: int) -> YearTable:
+    """Returns the ``YearTable`` of a year."""
+    return YearTable.build(year)
@@ -4,7 +4,12 @@ The ``UserConfiguration`` class stores user actionable parameters.
 """
 
 from dataclasses import dataclass, field
+import pathlib
+from typing import Optional
+
+from .date import date
 from .event import Event, get_public_holidays
+from .rules import CustodyRules
 
 
 @dataclass
@@ -15,6 +20,9 @@ class UserConfiguration:
     template_search_path: str
     comments_html: str
     school_holidays: Event
+    custody_overrides: dict[date, str] = field(default_factory=dict)
+    comments_path: Optional[pathlib.Path] = None
+    custody_rules: CustodyRules = field(default_factory=CustodyRules)
     public_holidays: Event = field(init=False)
 
     def __post_init__(self):
@@ -1,11 +1,164 @@
 """kaloot.custody - Provides functions to get the guardian for a given day."""
 
-from .date import date, date_collection
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+import functools
+import json
+import sys
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Iterator, Mapping, Optional
+
+from .calendar import fathers_day, mothers_day, year_table
+from .date import date, date_collection, date_range
+
+if TYPE_CHECKING:
+    from .config import UserConfiguration
+    from .rules import CustodyRules
 
 
 def guardian_transition(first: str, second: str) -> str:
     """Returns a string corresponding to a transition from first to second guardian."""
-    return f"{first}→{second}"
+    return sys.intern(f"{first}→{second}")
+
+
+def split_transition(guardian: str) -> tuple[str, str]:
+    """Returns the guardians before and after a transition.
+
+    A guardian that is not a transition is returned twice, e.g. ``("B", "B")``.
+    """
+    first, separator, second = guardian.partition("→")
+    if not separator:
+        return guardian, guardian
+    return first, second
+
+
+@dataclass(frozen=True)
+class HolidayPeriod:
+    """Stores the days of a holiday period that matter for custody."""
+
+    first: date
+    last: date
+    transition: date
+
+    @classmethod
+    def from_collection(cls, holidays: date_collection) -> HolidayPeriod:
+        """Returns a new ``HolidayPeriod`` from the dates of a single holiday period."""
+        return cls(holidays[0], holidays[-1], get_holidays_transition_date(holidays))
+
+    def __contains__(self, day: date) -> bool:
+        """Returns ``True`` if the date is in the period, ``False`` otherwise."""
+        return self.first <= day <= self.last
+
+
+class HolidayIndex:
+    """Indexes the holiday periods of a ``date_collection``.
+
+    As with ``get_holidays``, a day belongs to the first declared range it is in,
+    single dates coming after the ranges. The days each range keeps are stored as
+    disjoint segments sorted by start date, so that the period a day belongs to is
+    found by bisection. The ``HolidayPeriod`` of each range is computed on first use.
+    """
+
+    def __init__(self, holidays: date_collection):
+        self.holidays = holidays
+        declared = list(holidays.ranges)
+        declared += [date_range(day, day) for day in holidays.date_list]
+        self._ranges = sorted(declared, key=lambda range_: range_.start)
+
+        # (start, end, position) of the days range ``declared[position]`` keeps,
+        # i.e. its days that are not in a range declared before.
+        segments: list[tuple[int, int, int]] = []
+        for position, range_ in enumerate(declared):
+            start, end = range_.start.toordinal(), range_.end.toordinal()
+            index = bisect.bisect_right(segments, (start, sys.maxsize)) - 1
+            if index < 0 or segments[index][1] < start:
+                index += 1
+            kept = []
+            while index < len(segments) and segments[index][0] <= end:
+                if start < segments[index][0]:
+                    kept.append((start, segments[index][0] - 1, position))
+                start = max(start, segments[index][1] + 1)
+                index += 1
+            if start <= end:
+                kept.append((start, end, position))
+            for segment in kept:
+                bisect.insort(segments, segment)
+
+        self._declared = declared
+        self._starts = [start for start, _, _ in segments]
+        self._ends = [end for _, end, _ in segments]
+        self._owners = [position for _, _, position in segments]
+        self._periods: dict[int, HolidayPeriod] = {}
+
+    @classmethod
+    def of(cls, holidays: date_collection | HolidayIndex) -> HolidayIndex:
+        """Returns ``holidays`` as a ``HolidayIndex``, building it if needed."""
+        if isinstance(holidays, HolidayIndex):
+            return holidays
+        return cls(holidays)
+
+    def _find_position(self, day: date) -> Optional[int]:
+        """Returns the declaration position of the range a date belongs to.
+
+        Returns ``None`` if the date is not a holiday.
+        """
+        ordinal = day.toordinal()
+        segment = bisect.bisect_right(self._starts, ordinal) - 1
+        if segment < 0 or self._ends[segment] < ordinal:
+            return None
+        return self._owners[segment]
+
+    def find_range(self, day: date) -> Optional[date_range]:
+        """Returns the holiday range a date belongs to, ``None`` if there is none."""
+        position = self._find_position(day)
+        return None if position is None else self._declared[position]
+
+    def find(self, day: date) -> Optional[HolidayPeriod]:
+        """Returns the holiday period a date belongs to, ``None`` if there is none."""
+        position = self._find_position(day)
+        if position is None:
+            return None
+        period = self._periods.get(position)
+        if period is None:
+            period = HolidayPeriod.from_collection(
+                self._declared[position].ascollection()
+            )
+            self._periods[position] = period
+        return period
+
+    def __contains__(self, day: date) -> bool:
+        """Returns ``True`` if the date is a holiday, ``False`` otherwise."""
+        return self._find_position(day) is not None
+
+    def iter_segments(
+        self, first: date, last: date
+    ) -> Iterator[tuple[int, int, date_range]]:
+        """Yields the holiday days from ``first`` to ``last``, segment by segment.
+
+        A day belongs to the same range as with ``find``, so a range overlapped by
+        one declared before it is split around it. Yields the first and last
+        ordinals of the days of each segment, and the range they belong to.
+        """
+        first_ordinal, last_ordinal = first.toordinal(), last.toordinal()
+        segment = max(bisect.bisect_right(self._starts, first_ordinal) - 1, 0)
+        for segment in range(segment, len(self._starts)):
+            start = self._starts[segment]
+            if start > last_ordinal:
+                break
+            start = max(start, first_ordinal)
+            end = min(self._ends[segment], last_ordinal)
+            if start <= end:
+                yield start, end, self._declared[self._owners[segment]]
+
+    @property
+    def ranges(self) -> list[date_range]:
+        """The holiday periods, sorted by start date. Single dates are 1-day ranges."""
+        return list(self._ranges)
+
+
+NO_HOLIDAYS = HolidayIndex(date_collection())
 
 
 def get_holidays(day: date, holidays: date_collection) -> date_collection:
@@ -30,15 +183,17 @@ def get_holidays_transition_date(holidays: date_collection) -> date:
     return holidays[0].next_saturday()
 
 
-def get_guardian_holidays(day: date, holidays: date_collection) -> str:
+def get_guardian_holidays(day: date, holidays: date_collection | HolidayIndex) -> str:
     """Returns the guardian on an holiday day."""
 
     first, second = "B", "L"
     if day.is_even_year():
         first, second = "L", "B"
 
-    holidays = get_holidays(day, holidays)
-    transition_day = get_holidays_transition_date(holidays)
+    period = HolidayIndex.of(holidays).find(day)
+    if period is None:
+        raise ValueError(f"{day}: not a holiday")
+    transition_day = period.transition
 
     if day < transition_day:
         return first
@@ -53,70 +208,101 @@ def get_guardian_holidays(day: date, holidays: date_collection) -> str:
 
     # If it is the last day of the holidays, we need to check the next day:
     # if the guardian on the next day is not the current guardian, we need to transition.
-    if day.is_last_day_of(holidays):
-        guardian = get_next_week_guardian(day, holidays)
+    if day == period.last:
+        guardian = get_next_week_guardian(day, NO_HOLIDAYS)
         if guardian[0] != second:
             return guardian_transition(second, first)
     return second
 
 
-def get_next_week_guardian(day: date, holidays: date_collection) -> str:
+def get_next_week_guardian(day: date, holidays: date_collection | HolidayIndex) -> str:
     """Returns the guardian for the next week."""
     return get_guardian_regular_week(day.next(), holidays)
 
 
-def get_guardian_even_week(day: date, holidays: date_collection) -> str:
+def get_guardian_even_week(day: date, holidays: date_collection | HolidayIndex) -> str:
     """Get the guardian for a day, on even weeks."""
+    holidays = HolidayIndex.of(holidays)
     if day.next() in holidays:
         guardian = get_guardian_holidays(day.next(), holidays)
         if guardian == "L":
             return "L"
         return guardian_transition("L", "B")
-    if day.is_tuesday():
+    table = year_table(day.year)
+    weekday = table.weekday[table.index(day)]
+    if weekday == 1:  # Tuesday
         return guardian_transition("L", "B")
-    if day.is_wednesday():
+    if weekday == 2:  # Wednesday
         return guardian_transition("B", "L")
-    if day.is_friday():
+    if weekday == 4:  # Friday
         return guardian_transition("L", "B")
-    if day.is_weekend():
+    if weekday > 4:  # weekend
         return "B"
     return "L"
 
 
-def get_guardian_odd_week(day: date, holidays: date_collection) -> str:
+def get_guardian_odd_week(day: date, holidays: date_collection | HolidayIndex) -> str:
     """Get the guardian for a day, on even weeks."""
+    holidays = HolidayIndex.of(holidays)
     if day.next() in holidays:
         guardian = get_guardian_holidays(day.next(), holidays)
         if guardian == "B":
             return "B"
         return guardian_transition("B", "L")
-    if day.is_friday():
+    table = year_table(day.year)
+    weekday = table.weekday[table.index(day)]
+    if weekday == 4:  # Friday
         return guardian_transition("B", "L")
-    if day.is_weekend():
+    if weekday > 4:  # weekend
         return "L"
     return "B"
 
 
-def get_guardian_regular_week(day: date, holidays: date_collection) -> str:
+def get_guardian_regular_week(
+    day: date, holidays: date_collection | HolidayIndex
+) -> str:
     """Returns the guardian on a regular week i.e. not holidays."""
-    if day.is_even_week():
+    table = year_table(day.year)
+    if table.is_even_week(table.index(day)):
         return get_guardian_even_week(day, holidays)
-    if day.is_odd_week():
-        return get_guardian_odd_week(day, holidays)
-    raise RuntimeError(f"{day}: week appears to be neither even or odd")
+    return get_guardian_odd_week(day, holidays)
 
 
-def get_guardian(day: date, holidays: date_collection) -> str:
-    """Get the guardian for a day."""
-    if day.is_fathers_day():
-        return "B"
-    if day.is_mothers_day():
-        return "L"
+def get_guardian_scheduled(day: date, holidays: date_collection | HolidayIndex) -> str:
+    """Get the guardian for a day, leaving Mother's and Father's day aside."""
+    holidays = HolidayIndex.of(holidays)
     if day in holidays:
         return get_guardian_holidays(day, holidays)
     return get_guardian_regular_week(day, holidays)
 
 
+@functools.cache
+def get_special_days(year: int) -> Mapping[date, str]:
+    """Returns the days of a year that have a fixed guardian.
+
+    Father's day is always with "B", Mother's day always with "L".
+    """
+    return MappingProxyType({fathers_day(year): "B", mothers_day(year): "L"})
+
+
+def get_guardian(
+    day: date,
+    holidays: date_collection | HolidayIndex,
+    overrides: Optional[Mapping[date, str]] = None,
+) -> str:
+    """Get the guardian for a day.
+
+    ``overrides`` maps days to a user-defined guardian. Overrides take precedence
+    over special days, which take precedence over the holiday and week rules.
+    """
+    if overrides and day in overrides:
+        return overrides[day]
+    guardian = get_special_days(day.year).get(day)
+    if guardian is not None:
+        return guardian
+    return get_guardian_scheduled(day, holidays)
+
+
 def is_summer_holidays(holidays: date_collection) -> bool:
     """Returns True if the holidays are summer holidays."""
     return 6 <= holidays[0].month <= 7
@@ -125,3 +311,360 @@ def is_summer_holidays(holidays: date_collection) -> bool:
 def is_regular_holidays(holidays: date_collection) -> bool:
     """Returns True if the holidays are regular holidays, i.e. not summer holidays."""
     return not is_summer_holidays(holidays)
+
+
+@dataclass(frozen=True)
+class CustodyTimeline:
+    """Stores the guardian of every day of a year.
+
+    Guardians are stored in a tuple indexed by the day of the year, starting at 0.
+    """
+
+    year: int
+    guardians: tuple[str, ...] = field(repr=False)
+    _first_ordinal: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_first_ordinal", date(self.year, 1, 1).toordinal())
+
+    def __getitem__(self, day: date) -> str:
+        """Returns the guardian for the given day."""
+        if day.year != self.year:
+            raise KeyError(f"{day}: not in {self.year}")
+        return self.guardians[day.toordinal() - self._first_ordinal]
+
+    def __contains__(self, day: object) -> bool:
+        """Returns ``True`` if the date is covered by the timeline, ``False`` otherwise."""
+        return isinstance(day, date) and day.year == self.year
+
+    def __len__(self) -> int:
+        """Returns the number of days in the timeline."""
+        return len(self.guardians)
+
+
+def get_fixed_guardians(
+    year: int, overrides: Optional[Mapping[date, str]] = None
+) -> dict[date, str]:
+    """Returns the days of a year whose guardian does not depend on the holidays.
+
+    These are the special days and the ``overrides``, which take precedence.
+    """
+    fixed = dict(get_special_days(year))
+    fixed.update(
+        (day, guardian)
+        for day, guardian in (overrides or {}).items()
+        if day.year == year
+    )
+    return fixed
+
+
+def solve_year(
+    year: int,
+    holidays: date_collection | HolidayIndex,
+    overrides: Optional[Mapping[date, str]] = None,
+    rules: Optional[CustodyRules] = None,
+) -> CustodyTimeline:
+    """Returns the guardian of every day of the year.
+
+    Holiday periods and special days are computed once for the whole year, then
+    each day is solved with the same rules as ``get_guardian``. If ``rules`` is
+    given, the year is solved from the compiled rules instead, see
+    ``kaloot.rules``.
+    """
+    if rules is not None:
+        return rules.compile().solve_year(year, holidays, overrides)
+    holidays = HolidayIndex.of(holidays)
+    special_days = get_fixed_guardians(year, overrides)
+
+    table = year_table(year)
+    guardians = []
+    for index in range(len(table)):
+        day = table.date(index)
+        guardian = special_days.get(day)
+        if guardian is None:
+            guardian = get_guardian_scheduled(day, holidays)
+        guardians.append(guardian)
+    return CustodyTimeline(year, tuple(guardians))
+
+
+@dataclass(frozen=True)
+class CustodyPeriod:
+    """Stores a run of consecutive days spent with the same guardian."""
+
+    guardian: str
+    first: date
+    last: date
+
+    def __len__(self) -> int:
+        """Returns the number of days in the period."""
+        return self.last.toordinal() - self.first.toordinal() + 1
+
+
+@dataclass(frozen=True)
+class Handover:
+    """Stores a day on which the children go from one guardian to the other."""
+
+    day: date
+    giver: str
+    receiver: str
+
+
+def iter_guardians(
+    start: date,
+    end: date,
+    holidays: date_collection | HolidayIndex,
+    overrides: Optional[Mapping[date, str]] = None,
+    rules: Optional[CustodyRules] = None,
+) -> Iterator[tuple[date, str]]:
+    """Yields every day from ``start`` to ``end`` with its guardian.
+
+    Days are solved one year at a time, so memory does not grow with the span.
+    """
+    holidays = HolidayIndex.of(holidays)
+    for year in range(start.year, end.year + 1):
+        timeline = solve_year(year, holidays, overrides, rules)
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year, 12, 31))
+        for day in date_range(first, last):
+            yield day, timeline[day]
+
+
+def iter_periods(
+    start: date,
+    end: date,
+    holidays: date_collection | HolidayIndex,
+    overrides: Optional[Mapping[date, str]] = None,
+    rules: Optional[CustodyRules] = None,
+) -> Iterator[CustodyPeriod | Handover]:
+    """Yields the custody periods and handovers from ``start`` to ``end``, in order.
+
+    Consecutive days with the same guardian are merged into a ``CustodyPeriod``,
+    transition days, e.g. ``"L→B"``, are yielded as a ``Handover`` between periods.
+    Periods spanning several years are not split.
+    """
+    guardian, first, previous = None, None, None
+    for day, day_guardian in iter_guardians(start, end, holidays, overrides, rules):
+        giver, receiver = split_transition(day_guardian)
+        if giver != receiver:
+            if guardian is not None:
+                yield CustodyPeriod(guardian, first, previous)
+                guardian = None
+            yield Handover(day, giver, receiver)
+        elif day_guardian != guardian:
+            if guardian is not None:
+                yield CustodyPeriod(guardian, first, previous)
+            guardian, first = day_guardian, day
+        previous = day
+    if guardian is not None:
+        yield CustodyPeriod(guardian, first, previous)
+
+
+@dataclass(frozen=True)
+class CustodyIndex:
+    """Answers which guardian has the children on a day, from first to last.
+
+    The days are stored as runs of consecutive days with the same guardian:
+    ``starts`` holds the ordinal of the first day of each run and ``guardians``
+    the guardian of each run. Transition days, e.g. ``"L→B"``, are runs of their
+    own. A day is looked up by bisection.
+    """
+
+    first: date
+    last: date
+    starts: tuple[int, ...] = field(repr=False)
+    guardians: tuple[str, ...] = field(repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        first: date,
+        last: date,
+        holidays: date_collection | HolidayIndex,
+        overrides: Optional[Mapping[date, str]] = None,
+        rules: Optional[CustodyRules] = None,
+    ) -> CustodyIndex:
+        """Returns the index of the days from ``first`` to ``last``."""
+        starts, guardians = [], []
+        for day, guardian in iter_guardians(first, last, holidays, overrides, rules):
+            if not guardians or guardian != guardians[-1]:
+                starts.append(day.toordinal())
+                guardians.append(guardian)
+        if not starts:
+            raise ValueError(f"empty custody index from {first} to {last}")
+        return cls(first, last, tuple(starts), tuple(guardians))
+
+    @classmethod
+    def from_config(cls, config: UserConfiguration) -> CustodyIndex:
+        """Returns the index of the year of a user configuration."""
+        return cls.build(
+            date(config.year, 1, 1),
+            date(config.year, 12, 31),
+            config.school_holidays.dates,
+            config.custody_overrides,
+            config.custody_rules,
+        )
+
+    def __contains__(self, day: object) -> bool:
+        """Returns ``True`` if the date is covered by the index, ``False`` otherwise."""
+        return isinstance(day, date) and self.first <= day <= self.last
+
+    def _position(self, day: date) -> int:
+        """Returns the position of the run a day belongs to."""
+        if day not in self:
+            raise KeyError(f"{day}: not between {self.first} and {self.last}")
+        return bisect.bisect_right(self.starts, day.toordinal()) - 1
+
+    def guardian_at(self, day: date) -> str:
+        """Returns the guardian on a day."""
+        return self.guardians[self._position(day)]
+
+    def guardian_between(self, first: date, last: date) -> list[CustodyPeriod]:
+        """Returns the runs of days with the same guardian from ``first`` to ``last``.
+
+        The first and last runs are cut to the requested days.
+        """
+        if last < first:
+            return []
+        start, stop = self._position(first), self._position(last)
+        periods = []
+        for position in range(start, stop + 1):
+            run_first = max(first.toordinal(), self.starts[position])
+            if position + 1 < len(self.starts):
+                run_last = min(last.toordinal(), self.starts[position + 1] - 1)
+            else:
+                run_last = last.toordinal()
+            periods.append(
+                CustodyPeriod(
+                    self.guardians[position],
+                    date.fromordinal(run_first),
+                    date.fromordinal(run_last),
+                )
+            )
+        return periods
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the index as a JSON-serializable dictionary."""
+        origin = self.first.toordinal()
+        return {
+            "first": self.first.isoformat(),
+            "last": self.last.isoformat(),
+            "offsets": [start - origin for start in self.starts],
+            "guardians": list(self.guardians),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> CustodyIndex:
+        """Returns an index from a dictionary made by ``to_dict``."""
+        first = date.fromisoformat(data["first"])
+        last = date.fromisoformat(data["last"])
+        offsets, guardians = data["offsets"], data["guardians"]
+        if len(offsets) != len(guardians) or not offsets or offsets[0] != 0:
+            raise ValueError("invalid custody index data")
+        origin = first.toordinal()
+        return cls(
+            first,
+            last,
+            tuple(origin + offset for offset in offsets),
+            tuple(sys.intern(guardian) for guardian in guardians),
+        )
+
+    def dumps(self) -> str:
+        """Returns the index serialized in JSON."""
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, text: str) -> CustodyIndex:
+        """Returns an index serialized with ``dumps``."""
+        return cls.from_dict(json.loads(text))
+
+
+@dataclass(frozen=True)
+class CustodyUpdate:
+    """Stores the outcome of an incremental update of a custody timeline."""
+
+    timeline: CustodyTimeline
+    changed: list[date]
+    recomputed: int
+
+
+def get_holidays_windows(
+    old_holidays: date_collection | HolidayIndex,
+    new_holidays: date_collection | HolidayIndex,
+) -> list[date_range]:
+    """Returns the days whose guardian depends on the holidays that changed.
+
+    The guardian during a holiday period only depends on that period, and the
+    guardian on the day before the holidays depends on the first day of the period.
+    So a period ``[first, last]`` that was added or removed affects the days from
+    ``first - 1`` to ``last``. Periods overlapping a changed one, in the old or the
+    new holidays, are affected as well.
+    """
+    old_ranges = {
+        (range_.start, range_.end) for range_ in HolidayIndex.of(old_holidays).ranges
+    }
+    new_ranges = {
+        (range_.start, range_.end) for range_ in HolidayIndex.of(new_holidays).ranges
+    }
+    changed = old_ranges ^ new_ranges
+
+    # Groups the overlapping periods, then keeps the groups with a changed period.
+    windows: list[date_range] = []
+    group_changed = False
+    for first, last in sorted(old_ranges | new_ranges):
+        if windows and first <= windows[-1].end.next():
+            if last > windows[-1].end:
+                windows[-1] = date_range(windows[-1].start, last)
+        else:
+            if windows and not group_changed:
+                windows.pop()
+            windows.append(date_range(first.previous(), last))
+            group_changed = False
+        group_changed = group_changed or (first, last) in changed
+    if windows and not group_changed:
+        windows.pop()
+    return windows
+
+
+def update_year(
+    timeline: CustodyTimeline,
+    old_holidays: date_collection | HolidayIndex,
+    new_holidays: date_collection | HolidayIndex,
+    overrides: Optional[Mapping[date, str]] = None,
+    rules: Optional[CustodyRules] = None,
+) -> CustodyUpdate:
+    """Returns the timeline solved with ``new_holidays`` instead of ``old_holidays``.
+
+    Only the days depending on the holiday periods that differ are solved again,
+    see ``get_holidays_windows``. ``timeline`` must have been solved with
+    ``old_holidays`` and the same ``overrides`` and ``rules``. The update lists
+    the days whose guardian changed.
+    """
+    year = timeline.year
+    new_holidays = HolidayIndex.of(new_holidays)
+    if rules is None:
+        fixed = get_fixed_guardians(year, overrides)
+        get_scheduled = get_guardian_scheduled
+    else:
+        compiled = rules.compile()
+        fixed = compiled.fixed_guardians(year, overrides)
+        get_scheduled = compiled.scheduled_guardian
+    table = year_table(year)
+    guardians = list(timeline.guardians)
+    changed, recomputed = [], 0
+    for window in get_holidays_windows(old_holidays, new_holidays):
+        if window.end.year < year or window.start.year > year:
+            continue
+        first = max(window.start, date(year, 1, 1))
+        last = min(window.end, date(year, 12, 31))
+        for day in date_range(first, last):
+            if day in fixed:
+                continue
+            recomputed += 1
+            guardian = get_scheduled(day, new_holidays)
+            index = table.index(day)
+            if guardian != guardians[index]:
+                guardians[index] = guardian
+                changed.append(day)
+    if not changed:
+        return CustodyUpdate(timeline, changed, recomputed)
+    return CustodyUpdate(CustodyTimeline(year, tuple(guardians)), changed, recomputed)
@@ -1,11 +1,14 @@
-"""Provides the ``date``, ``date_range`` and ``date_collection`` classes."""
+"""Provides the ``date``, ``date_range``, ``date_collection`` and ``date_bitset`` classes."""
 
 from __future__ import annotations
 
+import bisect
 import collections
+import dataclasses
 from dataclasses import dataclass, field
 import datetime
-from typing import Iterator, Optional
+import functools
+from typing import Iterable, Iterator, Optional, Sequence
 
 
 def current_year() -> int:
@@ -13,31 +16,94 @@ def current_year() -> int:
     return datetime.datetime.now().year
 
 
+# Interned ``date`` instances, by ordinal. The table is cleared when it is full.
+_INTERNED: dict[int, date] = {}
+
+# Maximum number of interned ``date`` instances, about 180 years of days.
+_INTERNED_SIZE = 1 << 16
+
+
+def _intern(obj: date) -> date:
+    """Returns the interned instance of the day of ``obj``."""
+    interned = _INTERNED.get(obj.toordinal())
+    if interned is None:
+        if len(_INTERNED) >= _INTERNED_SIZE:
+            _INTERNED.clear()
+        interned = _INTERNED[obj.toordinal()] = obj
+    return interned
+
+
 class date(datetime.date):  # pylint: disable=invalid-name  # conforms to datetime.date
     """Provides a date class with additional methods compared to ``datetime.date``.
 
     The ``date`` class also provides a ``description`` attribute that can be used to
     store a description of the date.
-    """
 
-    description: str
+    Dates without a description are interned: every day maps to a single shared
+    ``date`` instance, whose description cannot be set. Dates created with a
+    description are instances of their own. Instances have no ``__dict__``.
+    """
 
-    def __new__(cls, *args, **kwargs):
-        description = kwargs.pop("description", "")
-        obj = super().__new__(cls, *args, **kwargs)
-        obj.description = description
+    __slots__ = ("_description",)
+
+    def __new__(
+        cls,
+        year: int | bytes,
+        month: Optional[int] = None,
+        day: Optional[int] = None,
+        description: str = "",
+    ):
+        if month is None:  # pickled ``datetime.date`` state
+            obj = super().__new__(cls, year)
+        else:
+            obj = super().__new__(cls, year, month, day)
+        if description:
+            obj._description = description
+        elif cls is date:
+            obj = _intern(obj)
         return obj
 
+    def __reduce__(self):
+        """Pickles the date with its description."""
+        return type(self), (self.year, self.month, self.day, self.description)
+
+    @classmethod
+    def fromordinal(cls, ordinal: int) -> date:
+        """Returns the date corresponding to a proleptic Gregorian ordinal."""
+        if cls is date:
+            obj = _INTERNED.get(ordinal)
+            if obj is not None:
+                return obj
+        return super().fromordinal(ordinal)
+
+    @property
+    def description(self) -> str:
+        """The description of the date, an empty string if there is none."""
+        return getattr(self, "_description", "")
+
+    @description.setter
+    def description(self, description: str):
+        if not description:
+            if hasattr(self, "_description"):
+                del self._description
+        elif _INTERNED.get(self.toordinal()) is self:
+            raise AttributeError(
+                f"{self}: cannot describe a shared date,"
+                " use date(..., description=...) instead"
+            )
+        else:
+            self._description = description
+
     def __add__(self, other: int | datetime.timedelta) -> date:
         """Adds a number of days to the date."""
         if isinstance(other, int):
-            return self + datetime.timedelta(days=other)
+            return type(self).fromordinal(self.toordinal() + other)
         return super().__add__(other)
 
     def __sub__(self, other: int | datetime.timedelta) -> date:
         """Subtracts a number of days from the date."""
         if isinstance(other, int):
-            return self - datetime.timedelta(days=other)
+            return type(self).fromordinal(self.toordinal() - other)
         return super().__sub__(other)
 
     def name(self) -> str:
@@ -45,8 +111,11 @@ class date(datetime.date):  # pylint: disable=invalid-name  # conforms to dateti
         return self.strftime("%A")
 
     @classmethod
-    def from_string(cls, date_string: str, year: int = current_year()) -> date:
-        """Returns a new `date` from a string."""
+    def from_string(cls, date_string: str, year: Optional[int] = None) -> date:
+        """Returns a new `date` from a string.
+
+        ``year`` is used when the string has no year (default: the current year).
+        """
         tokens = [token.strip() for token in date_string.split("/")]
         if len(tokens) == 3:
             day_s, month_s, year_s = tokens
@@ -56,6 +125,8 @@ class date(datetime.date):  # pylint: disable=invalid-name  # conforms to dateti
         elif len(tokens) == 2:
             day_s, month_s = tokens
             day, month = int(day_s), int(month_s)
+            if year is None:
+                year = current_year()
         else:
             raise ValueError(f"Invalid date string: {date_string:!r}")
         try:
@@ -118,15 +189,15 @@ class date(datetime.date):  # pylint: disable=invalid-name  # conforms to dateti
 
     def is_mothers_day(self) -> bool:
         """Returns ``True`` if the date is Mother's Day, ``False`` otherwise."""
-        from .calendar import Calendar
+        from .calendar import mothers_day
 
-        return self == Calendar(self.year).mothers_day()
+        return self == mothers_day(self.year)
 
     def is_fathers_day(self) -> bool:
         """Returns ``True`` if the date is Father's Day, ``False`` otherwise."""
-        from .calendar import Calendar
+        from .calendar import fathers_day
 
-        return self == Calendar(self.year).fathers_day()
+        return self == fathers_day(self.year)
 
     def is_even_year(self) -> bool:
         """Returns ``True`` if the date is in an even year, ``False`` otherwise."""
@@ -171,16 +242,24 @@ class date(datetime.date):  # pylint: disable=invalid-name  # conforms to dateti
         return self == collection[-1]
 
 
-@dataclass
+@dataclass(frozen=True)
 class date_range:  # pylint: disable=invalid-name  # conforms to datetime.date
-    """Represents a range of dates."""
+    """Represents a range of dates.
+
+    Ranges are immutable, use ``replace`` to get a range with other bounds.
+    """
 
     start: date
     end: date
 
     @classmethod
-    def from_string(cls, date_range_str: str, year: int = current_year()) -> date_range:
-        """Returns a new date_range from a string representation."""
+    def from_string(
+        cls, date_range_str: str, year: Optional[int] = None
+    ) -> date_range:
+        """Returns a new date_range from a string representation.
+
+        ``year`` is used for dates without a year (default: the current year).
+        """
         if "-" not in date_range_str:
             raise ValueError(f"invalid date range string '{date_range_str}'")
         tokens = date_range_str.split("-")
@@ -188,18 +267,29 @@ class date_range:  # pylint: disable=invalid-name  # conforms to datetime.date
         start, end = [date.from_string(tok, year) for tok in tokens]
         return cls(start, end)
 
+    def replace(self, **changes: date) -> date_range:
+        """Returns a new range with the ``start`` and ``end`` given in ``changes``."""
+        return dataclasses.replace(self, **changes)
+
     def __contains__(self, day: date) -> bool:
         """Returns ``True`` if the date is in the range, ``False`` otherwise."""
         return self.start <= day <= self.end
 
     def __iter__(self) -> Iterator[date]:
         """Returns an iterator over the dates in the range."""
-        for delta in range((self.end - self.start).days + 1):
-            yield self.start + datetime.timedelta(days=delta)
+        for ordinal in range(self.start.toordinal(), self.end.toordinal() + 1):
+            yield date.fromordinal(ordinal)
 
     def __getitem__(self, index: int) -> date:
         """Returns the date at the given index."""
-        return self.aslist()[index]
+        if isinstance(index, slice):
+            return self.aslist()[index]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("date_range index out of range")
+        return self.start + index
 
     def __len__(self) -> int:
         """Returns the range length in days."""
@@ -217,59 +307,187 @@ class date_range:  # pylint: disable=invalid-name  # conforms to datetime.date
         """Returns a ``date_collection`` with all dates within the range."""
         return date_collection(ranges=[self])
 
+    def asbitset(self) -> date_bitset:
+        """Returns a ``date_bitset`` with all dates within the range."""
+        return date_bitset.from_intervals(
+            [(self.start.toordinal(), self.end.toordinal())]
+        )
+
     def half(self) -> date:
         """Returns the date that corresponds to middle of the range."""
         delta = datetime.timedelta(len(self) / 2)
-        return self.aslist()[0] + delta
+        return self.start + delta
 
 
 @dataclass
 class date_collection(
     collections.abc.Collection
 ):  # pylint: disable=invalid-name  # conforms to datetime.date
-    """Stores list of dates and date ranges."""
+    """Stores list of dates and date ranges.
+
+    Dates and ranges are indexed as sorted, disjoint intervals of day ordinals:
+    overlapping and adjacent ranges are merged and duplicate dates are counted once.
+    Membership, length and indexing work on the intervals and never build the list
+    of all dates. Dates of ``date_list`` with a description are returned as is.
+
+    The index is rebuilt when ``date_list`` or ``ranges`` no longer hold the
+    indexed dates and ranges, e.g. after a range was replaced in place.
+    """
 
     date_list: list[date] = field(default_factory=list)
     ranges: list[date_range] = field(default_factory=list)
+    _starts: list[int] = field(
+        init=False, repr=False, compare=False, default_factory=list
+    )
+    _ends: list[int] = field(
+        init=False, repr=False, compare=False, default_factory=list
+    )
+    # Number of days before each interval, plus the total number of days.
+    _offsets: list[int] = field(
+        init=False, repr=False, compare=False, default_factory=list
+    )
+    # Copies of the indexed ``date_list`` and ``ranges``.
+    _indexed: tuple[Sequence[date], Sequence[date_range]] = field(
+        init=False, repr=False, compare=False, default=((), ())
+    )
+    # Dates of ``date_list`` with a description, by ordinal.
+    _described: dict[int, date] = field(
+        init=False, repr=False, compare=False, default_factory=dict
+    )
+
+    def __post_init__(self):
+        self._reindex()
+
+    def _reindex(self):
+        """Rebuilds the interval index from ``date_list`` and ``ranges``."""
+        self._starts, self._ends, self._offsets = [], [], [0]
+        self._described = {}
+        for range_ in self.ranges:
+            self._insert(range_.start.toordinal(), range_.end.toordinal())
+        for day in self.date_list:
+            self._insert(day.toordinal(), day.toordinal())
+            self._describe(day)
+        self._mark_indexed()
+
+    def _mark_indexed(self):
+        """Records that the index is up to date with ``date_list`` and ``ranges``."""
+        self._indexed = (self.date_list[:], self.ranges[:])
+
+    def _sync(self):
+        """Rebuilds the index if ``date_list`` or ``ranges`` were modified directly."""
+        date_list, ranges = self._indexed
+        if self.ranges != ranges or self.date_list != date_list:
+            self._reindex()
+
+    def __eq__(self, other: object) -> bool:
+        """Returns ``True`` if both collections hold the same dates and ranges.
+
+        Frozen and modifiable collections compare equal.
+        """
+        if not isinstance(other, date_collection):
+            return NotImplemented
+        return tuple(self.date_list) == tuple(other.date_list) and tuple(
+            self.ranges
+        ) == tuple(other.ranges)
+
+    def _describe(self, day: date):
+        """Keeps ``day`` to be returned as is if it has a description."""
+        if getattr(day, "description", ""):
+            self._described[day.toordinal()] = day
+
+    def _insert(self, start: int, end: int):
+        """Inserts the interval of ordinals [start, end] into the index."""
+        if end < start:
+            return
+        # Intervals that overlap or are adjacent to [start, end] are merged with it.
+        low = bisect.bisect_left(self._ends, start - 1)
+        high = bisect.bisect_right(self._starts, end + 1)
+        if low < high:
+            start = min(start, self._starts[low])
+            end = max(end, self._ends[high - 1])
+        self._starts[low:high] = [start]
+        self._ends[low:high] = [end]
+        del self._offsets[low + 1 :]
+        for position in range(low, len(self._starts)):
+            length = self._ends[position] - self._starts[position] + 1
+            self._offsets.append(self._offsets[position] + length)
 
     def aslist(self) -> list[date]:
         """Returns the sorted list of all dates in the collection."""
-        return sorted(
-            self.date_list + [date for r in self.ranges for date in r.aslist()]
-        )
+        return list(self)
 
     def __contains__(self, day: object) -> bool:
         """Returns ``True`` if the date is in the collection, ``False`` otherwise."""
         if not isinstance(day, date):
             return False
-        for _range in self.ranges:
-            if day in _range:
-                return True
-        return day in self.date_list
+        self._sync()
+        ordinal = day.toordinal()
+        position = bisect.bisect_right(self._starts, ordinal) - 1
+        return position >= 0 and ordinal <= self._ends[position]
 
     def __iter__(self) -> Iterator[date]:
-        """Returns an iterator over the dates in the collection."""
-        return iter(self.date_list)
+        """Returns an iterator over the sorted dates in the collection."""
+        self._sync()
+        described = self._described
+        for start, end in zip(self._starts, self._ends):
+            for ordinal in range(start, end + 1):
+                yield described.get(ordinal) or date.fromordinal(ordinal)
 
     def __len__(self) -> int:
         """Returns the number of dates in the collection."""
-        return sum(len(r) for r in self.ranges) + len(self.date_list)
+        self._sync()
+        return self._offsets[-1]
 
     def __getitem__(self, key: int) -> date:
         """Returns the date at the given index."""
-        return self.aslist()[key]
+        if isinstance(key, slice):
+            return self.aslist()[key]
+        length = len(self)
+        if key < 0:
+            key += length
+        if not 0 <= key < length:
+            raise IndexError("date_collection index out of range")
+        position = bisect.bisect_right(self._offsets, key) - 1
+        ordinal = self._starts[position] + key - self._offsets[position]
+        return self._described.get(ordinal) or date.fromordinal(ordinal)
 
     def number_of_days(self) -> int:
         """Returns the number of days in the collection."""
         return len(self)
 
+    def freeze(self) -> date_collection:
+        """Makes the collection read-only and returns it."""
+        self._sync()
+        self.date_list = tuple(self.date_list)
+        self.ranges = tuple(self.ranges)
+        self._mark_indexed()
+        return self
+
+    def is_frozen(self) -> bool:
+        """Returns ``True`` if the collection is read-only, ``False`` otherwise."""
+        return isinstance(self.date_list, tuple)
+
+    def _check_not_frozen(self):
+        """Raises a ``TypeError`` if the collection is read-only."""
+        if self.is_frozen():
+            raise TypeError("cannot modify a frozen date_collection")
+
     def add_range(self, the_range: date_range):
         """Adds a date range to the collection."""
+        self._check_not_frozen()
+        self._sync()
         self.ranges.append(the_range)
+        self._insert(the_range.start.toordinal(), the_range.end.toordinal())
+        self._mark_indexed()
 
     def add_date(self, the_date: date):
         """Adds a date to the collection."""
+        self._check_not_frozen()
+        self._sync()
         self.date_list.append(the_date)
+        self._insert(the_date.toordinal(), the_date.toordinal())
+        self._describe(the_date)
+        self._mark_indexed()
 
     def half(self) -> date:
         """Returns the date that corresponds to half the collection."""
@@ -284,29 +502,210 @@ class date_collection(
         """Returns ``True`` if the collection has an odd number of days, ``False`` otherwise."""
         return not self.has_even_number_of_days()
 
+    def asbitset(self) -> date_bitset:
+        """Returns a ``date_bitset`` with all dates in the collection.
+
+        Adjacent ranges and dates are kept apart, see ``date_bitset.breaks``.
+        """
+        intervals = [
+            (range_.start.toordinal(), range_.end.toordinal()) for range_ in self.ranges
+        ]
+        intervals += [(day.toordinal(), day.toordinal()) for day in self.date_list]
+        return date_bitset.from_intervals(intervals, keep_adjacent=True)
+
+
+@dataclass(frozen=True)
+class date_bitset(
+    collections.abc.Collection
+):  # pylint: disable=invalid-name  # conforms to datetime.date
+    """Stores a set of dates as a bitset of day ordinals.
 
-EASTER_SUNDAY = {
-    2021: date(2021, 4, 4),
-    2022: date(2022, 4, 17),
-    2023: date(2023, 4, 9),
-    2024: date(2024, 3, 31),
-    2025: date(2025, 4, 20),
-    2026: date(2026, 4, 5),
-    2027: date(2027, 3, 28),
-    2028: date(2028, 4, 16),
-    2029: date(2029, 4, 1),
-    2030: date(2030, 4, 21),
-    2031: date(2031, 4, 13),
-    2032: date(2032, 3, 28),
-    2033: date(2033, 4, 17),
-    2034: date(2034, 4, 9),
-    2035: date(2035, 3, 25),
-    2036: date(2036, 4, 13),
-    2037: date(2037, 4, 5),
-    2038: date(2038, 4, 25),
-    2039: date(2039, 4, 10),
-    2040: date(2040, 4, 1),
-}
+    Bit ``i`` of ``bits`` is set if the day with ordinal ``origin + i`` is in the set.
+    The bitset is normalized so that bit 0 is always set, which makes two bitsets
+    equal whenever they hold the same dates.
+
+    ``breaks`` holds the ordinals of the days that start a new range although the
+    previous day is in the set, e.g. the first day of two adjacent holiday ranges.
+    They are kept so that ``ascollection`` returns the original ranges, and do not
+    take part in comparisons.
+
+    Union (``|``), intersection (``&``), difference (``-``) and symmetric difference
+    (``^``) operate on whole bitsets at once. The breaks of both bitsets are kept
+    where they still separate two days of the result.
+    """
+
+    origin: int = 0
+    bits: int = 0
+    breaks: frozenset[int] = field(default=frozenset(), compare=False)
+
+    def __post_init__(self):
+        if self.bits < 0:
+            raise ValueError("date_bitset bits must be positive")
+        if self.bits == 0:
+            object.__setattr__(self, "origin", 0)
+            object.__setattr__(self, "breaks", frozenset())
+            return
+        trailing_zeros = (self.bits & -self.bits).bit_length() - 1
+        if trailing_zeros:
+            object.__setattr__(self, "origin", self.origin + trailing_zeros)
+            object.__setattr__(self, "bits", self.bits >> trailing_zeros)
+        if self.breaks:
+            breaks = frozenset(
+                ordinal
+                for ordinal in self.breaks
+                if ordinal - 1 >= self.origin
+                and self.bits >> (ordinal - 1 - self.origin) & 3 == 3
+            )
+            object.__setattr__(self, "breaks", breaks)
+
+    @classmethod
+    def from_intervals(
+        cls, intervals: Iterable[tuple[int, int]], keep_adjacent: bool = False
+    ) -> date_bitset:
+        """Returns a new ``date_bitset`` from intervals of ordinals, bounds included.
+
+        If ``keep_adjacent`` is ``True``, an interval starting the day after another
+        one ends is kept apart from it, see ``breaks``. Overlapping intervals are
+        always merged.
+        """
+        intervals = [(start, end) for start, end in intervals if start <= end]
+        if not intervals:
+            return cls()
+        origin = min(start for start, _ in intervals)
+        bits = 0
+        for start, end in intervals:
+            bits |= ((1 << (end - start + 1)) - 1) << (start - origin)
+        breaks: frozenset[int] = frozenset()
+        if keep_adjacent:
+            ends = {end for _, end in intervals}
+            breaks = frozenset(start for start, _ in intervals if start - 1 in ends)
+        return cls(origin, bits, breaks)
+
+    @classmethod
+    def from_dates(cls, dates: Iterable[datetime.date]) -> date_bitset:
+        """Returns a new ``date_bitset`` from dates."""
+        return cls.from_intervals((day.toordinal(), day.toordinal()) for day in dates)
+
+    @classmethod
+    def from_weekdays(
+        cls, the_range: date_range, weekdays: Iterable[int]
+    ) -> date_bitset:
+        """Returns the dates of a range that fall on the given weekdays (Monday is 0)."""
+        start = the_range.start.toordinal()
+        week = 0
+        for weekday in set(weekdays):
+            week |= 1 << ((weekday - the_range.start.weekday()) % 7)
+        bits = 0
+        for offset in range(0, len(the_range), 7):
+            bits |= week << offset
+        bits &= (1 << len(the_range)) - 1
+        return cls(start, bits)
+
+    def _align(self, other: date_bitset) -> tuple[int, int, int]:
+        """Returns the common origin and both bitsets shifted to it."""
+        if not self.bits:
+            return other.origin, 0, other.bits
+        if not other.bits:
+            return self.origin, self.bits, 0
+        origin = min(self.origin, other.origin)
+        return (
+            origin,
+            self.bits << (self.origin - origin),
+            other.bits << (other.origin - origin),
+        )
+
+    def __or__(self, other: date_bitset) -> date_bitset:
+        """Returns the union of two bitsets."""
+        origin, bits, other_bits = self._align(other)
+        return date_bitset(origin, bits | other_bits, self.breaks | other.breaks)
+
+    def __and__(self, other: date_bitset) -> date_bitset:
+        """Returns the intersection of two bitsets."""
+        origin, bits, other_bits = self._align(other)
+        return date_bitset(origin, bits & other_bits, self.breaks | other.breaks)
+
+    def __sub__(self, other: date_bitset) -> date_bitset:
+        """Returns the dates of this bitset that are not in the other one."""
+        origin, bits, other_bits = self._align(other)
+        return date_bitset(origin, bits & ~other_bits, self.breaks | other.breaks)
+
+    def __xor__(self, other: date_bitset) -> date_bitset:
+        """Returns the dates that are in exactly one of the two bitsets."""
+        origin, bits, other_bits = self._align(other)
+        return date_bitset(origin, bits ^ other_bits, self.breaks | other.breaks)
+
+    def complement(self, universe: date_range) -> date_bitset:
+        """Returns the dates of ``universe`` that are not in the bitset."""
+        return universe.asbitset() - self
+
+    def __contains__(self, day: object) -> bool:
+        """Returns ``True`` if the date is in the bitset, ``False`` otherwise."""
+        if not isinstance(day, datetime.date):
+            return False
+        offset = day.toordinal() - self.origin
+        return offset >= 0 and bool(self.bits >> offset & 1)
+
+    def __iter__(self) -> Iterator[date]:
+        """Returns an iterator over the sorted dates in the bitset."""
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield date.fromordinal(self.origin + lowest.bit_length() - 1)
+            bits ^= lowest
+
+    def __len__(self) -> int:
+        """Returns the number of dates in the bitset."""
+        return self.bits.bit_count()
+
+    def count(self) -> int:
+        """Returns the number of dates in the bitset."""
+        return len(self)
+
+    def first(self) -> date:
+        """Returns the earliest date in the bitset."""
+        if not self.bits:
+            raise ValueError("first() of an empty date_bitset")
+        return date.fromordinal(self.origin)
+
+    def last(self) -> date:
+        """Returns the latest date in the bitset."""
+        if not self.bits:
+            raise ValueError("last() of an empty date_bitset")
+        return date.fromordinal(self.origin + self.bits.bit_length() - 1)
+
+    def intervals(self) -> Iterator[tuple[int, int]]:
+        """Returns an iterator over the runs of consecutive ordinals, bounds included."""
+        bits, offset = self.bits, 0
+        while bits:
+            skip = (bits & -bits).bit_length() - 1
+            bits >>= skip
+            offset += skip
+            length = (~bits & (bits + 1)).bit_length() - 1
+            yield self.origin + offset, self.origin + offset + length - 1
+            bits >>= length
+            offset += length
+
+    def ascollection(self) -> date_collection:
+        """Returns a ``date_collection`` with one range per run of consecutive dates.
+
+        Runs are split at ``breaks``, so the ranges of a collection converted with
+        ``date_collection.asbitset`` are found again, unless they overlapped.
+        """
+        ranges = []
+        breaks = sorted(self.breaks)
+        for start, end in self.intervals():
+            low = bisect.bisect_right(breaks, start)
+            high = bisect.bisect_right(breaks, end)
+            for break_ in breaks[low:high]:
+                ranges.append((start, break_ - 1))
+                start = break_
+            ranges.append((start, end))
+        return date_collection(
+            ranges=[
+                date_range(date.fromordinal(start), date.fromordinal(end))
+                for start, end in ranges
+            ]
+        )
 
 
 def date_description(
@@ -319,28 +718,48 @@ def date_description(
     if isinstance(year, int):
         assert month is not None
         assert day is not None
-        obj = date(year, month, day)
-    else:
-        obj = year
-    obj.description = description
-    return obj
+        return date(year, month, day, description=description)
+    return date(year.year, year.month, year.day, description=description)
 
 
-def paques(year: int = current_year()) -> date:
-    """Returns the date of Easter Sunday."""
-    return EASTER_SUNDAY[year]
+def paques(year: Optional[int] = None) -> date:
+    """Returns the date of Easter Sunday (default: of the current year).
 
+    Uses the anonymous Gregorian algorithm (Meeus/Jones/Butcher).
+    """
+    return _paques(current_year() if year is None else year)
 
-def pentecote(year: int = current_year()) -> date:
-    """Returns the date of Pentecote."""
+
+@functools.cache
+def _paques(year: int) -> date:
+    golden = year % 19
+    century, year_of_century = divmod(year, 100)
+    leap_centuries, century_rest = divmod(century, 4)
+    correction = (century - (century + 8) // 25 + 1) // 3
+    epact = (19 * golden + century - leap_centuries - correction + 15) % 30
+    leap_years, year_rest = divmod(year_of_century, 4)
+    weekday = (32 + 2 * century_rest + 2 * leap_years - epact - year_rest) % 7
+    shift = (golden + 11 * epact + 22 * weekday) // 451
+    month, day = divmod(epact + weekday - 7 * shift + 114, 31)
+    return date(year, month, day + 1)
+
+
+def pentecote(year: Optional[int] = None) -> date:
+    """Returns the date of Pentecote (default: of the current year)."""
     return paques(year) + datetime.timedelta(49)
 
 
-def public_holidays(year: int = current_year()) -> date_collection:
-    """Returns the list public holidays.
+def public_holidays(year: Optional[int] = None) -> date_collection:
+    """Returns the list public holidays (default: of the current year).
 
-    Each date has a description.
+    Each date has a description. The collection is frozen and shared between calls
+    for the same year.
     """
+    return _public_holidays(current_year() if year is None else year)
+
+
+@functools.cache
+def _public_holidays(year: int) -> date_collection:
     delta = datetime.timedelta
     day_paques = paques(year)
     day_pentecote = pentecote(year)
@@ -363,4 +782,12 @@ def public_holidays(year: int = current_year()) -> date_collection:
         ]
     )
 
-    return col
+    return col.freeze()
+
+
+def public_holidays_range(start_year: int, end_year: int) -> dict[int, date_collection]:
+    """Returns the public holidays of every year from ``start_year`` to ``end_year``.
+
+    Both years are included. Collections are shared with ``public_holidays``.
+    """
+    return {year: public_holidays(year) for year in range(start_year, end_year + 1)}
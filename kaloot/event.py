@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 
 from . import date
 
@@ -22,7 +22,7 @@ class Event:
 
     @classmethod
     def from_yaml(
-        cls, name: str, event_data: dict[str, Any], year: int = date.current_year()
+        cls, name: str, event_data: dict[str, Any], year: Optional[int] = None
     ) -> Event:
         """Creates an Event from a YAML event data tuple.
 
@@ -30,7 +30,7 @@ class Event:
             name: The event name.
             event_data: A tuple containing the css class and a list of dates.
             year: The year of the event. This is necessay when dates are formatted
-                without a year.
+                without a year (default: the current year).
         """
 
         def parse_date_list(datestrlist: str) -> date.date_collection:
@@ -1,10 +1,17 @@
 """kaloot.feature - Feature classes for the calendar."""
 
+from __future__ import annotations
+
+import array
 from dataclasses import dataclass, field
+from typing import Optional
 
-from .custody import get_guardian
-from .date import date
+from . import cache
+from .calendar import year_table
+from .custody import CustodyTimeline, solve_year
+from .date import date, date_range
 from .event import Event
+from .rules import CustodyRules
 
 
 @dataclass(kw_only=True)
@@ -17,8 +24,9 @@ class Feature:
     def format_attrs(self, day: date) -> str:
         """Returns the HTML attributes for the cell."""
         attrs = {}
-        if self.dynamic_css_class(day):
-            attrs["class"] = " ".join(self.dynamic_css_class(day))
+        css_class = self.dynamic_css_class(day)
+        if css_class:
+            attrs["class"] = " ".join(css_class)
         attrs_str = " ".join(f'{key}="{value}"' for key, value in attrs.items())
         return attrs_str
 
@@ -30,6 +38,23 @@ class Feature:
         """Returns the text for the cell."""
         return ""
 
+    def format_column(self, days: list[date]) -> tuple[list[str], list[str]]:
+        """Returns the HTML attributes and the stripped text of the cells of many days.
+
+        Subclasses can override this method to evaluate all days at once.
+        """
+        attrs = [self.format_attrs(day) for day in days]
+        texts = [self.format_text(day).strip() for day in days]
+        return attrs, texts
+
+    def fingerprint(self, first: date, last: date) -> Optional[tuple]:
+        """Returns the data the cells from ``first`` to ``last`` depend on.
+
+        Two fingerprints are equal only if the cells are. Returns ``None`` if the
+        cells have to be evaluated to be compared.
+        """
+        return None
+
 
 class TextFeature(Feature):
     """Base class for text features."""
@@ -42,6 +67,10 @@ class DayNumberFeature(TextFeature):
         """Returns the day number for the given day."""
         return f"{day.day:02d}"
 
+    def fingerprint(self, first: date, last: date) -> Optional[tuple]:
+        """Returns the data the cells from ``first`` to ``last`` depend on."""
+        return (type(self).__name__, self.css_class, first, last)
+
 
 @dataclass
 class DayAbbrFeature(TextFeature):
@@ -53,6 +82,10 @@ class DayAbbrFeature(TextFeature):
         """Returns the day abbreviation for the given day."""
         return f"{self.names[day.weekday()]}"
 
+    def fingerprint(self, first: date, last: date) -> Optional[tuple]:
+        """Returns the data the cells from ``first`` to ``last`` depend on."""
+        return (type(self).__name__, self.css_class, self.names, first, last)
+
 
 @dataclass
 class ColorFeature(Feature):
@@ -91,14 +124,74 @@ class EventCollectionFeatureMerge(ColorFeature):
     """Feature for merge event collections."""
 
     event_list: list[Event]
+    masks: dict[int, array.array | list[int]] = field(
+        init=False, repr=False, default_factory=dict
+    )
+    _css_classes: dict[int, list[str]] = field(
+        init=False, repr=False, default_factory=dict
+    )
+
+    def year_masks(self, year: int) -> array.array | list[int]:
+        """Returns the event bitmask of every day of a year, computed on first use.
+
+        Bit ``i`` of a day's mask is set if the day belongs to the ``i``-th event.
+        """
+        if year not in self.masks:
+            table = year_table(year)
+            masks = [0] * len(table)
+            year_days = date_range(table.date(0), table.date(len(table) - 1))
+            for position, event in enumerate(self.event_list):
+                bit = 1 << position
+                days = event.dates.asbitset() & year_days.asbitset()
+                for start, end in days.intervals():
+                    for ordinal in range(start, end + 1):
+                        masks[ordinal - table.first_ordinal] |= bit
+            if len(self.event_list) <= 64:
+                masks = array.array("Q", masks)
+            self.masks[year] = masks
+        return self.masks[year]
+
+    def event_mask(self, day: date) -> int:
+        """Returns the bitmask of the events a day belongs to."""
+        table = year_table(day.year)
+        return self.year_masks(day.year)[table.index(day)]
 
     def dynamic_css_class(self, day: date) -> list[str]:
         """Returns the list of CSS classes that apply for this day."""
-        css = self.css_class.copy()
-        for event in self.event_list:
-            if day in event.dates:
-                css.append(event.css_class)
-        return css
+        mask = self.event_mask(day)
+        if mask not in self._css_classes:
+            css = self.css_class.copy()
+            for position, event in enumerate(self.event_list):
+                if mask >> position & 1:
+                    css.append(event.css_class)
+            self._css_classes[mask] = css
+        return self._css_classes[mask].copy()
+
+    def format_column(self, days: list[date]) -> tuple[list[str], list[str]]:
+        """Returns the HTML attributes and the text of the cells of many days.
+
+        Attributes are formatted once per distinct event bitmask.
+        """
+        attrs_by_mask: dict[int, str] = {}
+        attrs = []
+        for day in days:
+            mask = self.event_mask(day)
+            if mask not in attrs_by_mask:
+                attrs_by_mask[mask] = self.format_attrs(day)
+            attrs.append(attrs_by_mask[mask])
+        return attrs, [self.format_text(day).strip() for day in days]
+
+    def fingerprint(self, first: date, last: date) -> Optional[tuple]:
+        """Returns the data the cells from ``first`` to ``last`` depend on.
+
+        These are the days of each event between ``first`` and ``last``.
+        """
+        days = date_range(first, last).asbitset()
+        events = [
+            (event.css_class, list((event.dates.asbitset() & days).intervals()))
+            for event in self.event_list
+        ]
+        return (type(self).__name__, self.css_class, events)
 
 
 @dataclass
@@ -106,16 +199,79 @@ class CustodyFeature(TextFeature):
     """Feature for the children custody."""
 
     holidays: Event
+    overrides: dict[date, str] = field(default_factory=dict)
+    rules: Optional[CustodyRules] = None
+    timelines: dict[int, CustodyTimeline] = field(
+        init=False, repr=False, default_factory=dict
+    )
 
     def __post_init__(self):
         self.css_class = ["daycust"]
 
+    def timeline(self, year: int) -> CustodyTimeline:
+        """Returns the custody timeline for a year, solving it on first use."""
+        if year not in self.timelines:
+            self.timelines[year] = solve_year(
+                year, self.holidays.dates, self.overrides, self.rules
+            )
+        return self.timelines[year]
+
     def format_text(self, day: date) -> str:
         """Returns the custody for the given day."""
-        return get_guardian(day, self.holidays.dates)
+        return self.timeline(day.year)[day]
+
+    def fingerprint(self, first: date, last: date) -> Optional[tuple]:
+        """Returns the guardians from ``first`` to ``last``, in the same year."""
+        timeline = self.timeline(first.year)
+        start = first.toordinal() - date(first.year, 1, 1).toordinal()
+        stop = start + last.toordinal() - first.toordinal() + 1
+        return (type(self).__name__, self.css_class, timeline.guardians[start:stop])
 
 
 def merge(event_list: list[Event]) -> EventCollectionFeatureMerge:
     """Merge several ``Event`` instances into a ``EventCollectionFeatureMerge``."""
     return EventCollectionFeatureMerge(event_list)
 
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    """Stores the cells of every feature for every day of a year.
+
+    ``attrs[f][i]`` and ``texts[f][i]`` are the HTML attributes and the text of
+    feature ``f`` on the ``i``-th day of the year. Equal strings are shared.
+    """
+
+    year: int
+    first_ordinal: int
+    attrs: tuple[tuple[str, ...], ...]
+    texts: tuple[tuple[str, ...], ...]
+
+    @classmethod
+    def build(cls, features: list[Feature], year: int) -> FeatureMatrix:
+        """Evaluates every feature on every day of the year."""
+        table = year_table(year)
+        days = [table.date(index) for index in range(len(table))]
+        strings: dict[str, str] = {}
+        attrs, texts = [], []
+        for feature in features:
+            feature_attrs, feature_texts = feature.format_column(days)
+            attrs.append(tuple(strings.setdefault(s, s) for s in feature_attrs))
+            texts.append(tuple(strings.setdefault(s, s) for s in feature_texts))
+        return cls(year, table.first_ordinal, tuple(attrs), tuple(texts))
+
+    def __contains__(self, day: object) -> bool:
+        """Returns ``True`` if the date is in the matrix year, ``False`` otherwise."""
+        return isinstance(day, date) and day.year == self.year
+
+    def row(self, day: date) -> list[tuple[str, str]]:
+        """Returns the HTML attributes and text of every feature for a day."""
+        index = day.toordinal() - self.first_ordinal
+        return [
+            (attrs[index], texts[index]) for attrs, texts in zip(self.attrs, self.texts)
+        ]
+
+    def digest(self, first: date, last: date) -> str:
+        """Returns the digest of the cells of every feature from ``first`` to ``last``."""
+        start = first.toordinal() - self.first_ordinal
+        stop = last.toordinal() - self.first_ordinal + 1
+        return cache.digest(*(column[start:stop] for column in self.attrs + self.texts))
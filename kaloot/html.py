@@ -1,29 +1,55 @@
 """kaloot.html - HTML rendering of the calendar."""
 
+from __future__ import annotations
+
+import calendar
 from dataclasses import dataclass, field
+import functools
+import itertools
 import os
-from typing import Iterable
-
-import bs4
-import jinja2
+import re
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
-from .calendar import Calendar
+from . import cache
+from .calendar import Calendar, YearTable, year_table
 from .config import UserConfiguration
 from .date import current_year, date
 from .event import Event
 from .feature import (
     CustodyFeature,
     Feature,
+    FeatureMatrix,
     DayAbbrFeature,
     DayNumberFeature,
     ColorFeature,
 )
 from .feature import merge as merge_features
 
+if TYPE_CHECKING:
+    import concurrent.futures
+
+    import jinja2
+
+OUTPUT_FORMATS = ("raw", "minified", "pretty")
+
+# Help of the command line option choosing the output format.
+OUTPUT_FORMAT_HELP = (
+    "The output HTML format: pretty months as published, or the faster raw or"
+    " minified template output (default: pretty)"
+)
+
 
 @dataclass
 class HTMLConfiguration:
-    """Stores the HTML parameters for the calendar."""
+    """Stores the HTML parameters for the calendar.
+
+    ``output_format`` is one of:
+
+    - ``pretty`` (default): each month is reformatted with BeautifulSoup, as in
+      the published calendars,
+    - ``raw``: the templates output, as is, much faster to render,
+    - ``minified``: whitespace is collapsed (see ``minify``).
+    """
 
     css_class: dict[str, str] = field(
         default_factory=lambda: {
@@ -72,6 +98,15 @@ class HTMLConfiguration:
         }
     )
 
+    output_format: str = "pretty"
+
+    def __post_init__(self):
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"invalid output format '{self.output_format}',"
+                f" expected one of {', '.join(OUTPUT_FORMATS)}"
+            )
+
 
 @dataclass
 class MasterCalendar:
@@ -79,15 +114,32 @@ class MasterCalendar:
 
     user_config: UserConfiguration
     env: jinja2.Environment = field(init=False, repr=False)
-    config: HTMLConfiguration = field(
-        init=False, repr=False, default_factory=HTMLConfiguration
-    )
+    templates: dict[str, jinja2.Template] = field(init=False, repr=False)
+    config: HTMLConfiguration = field(repr=False, default_factory=HTMLConfiguration)
     _cal: Calendar = field(init=False, repr=False)
+    _year_table: YearTable = field(init=False, repr=False)
+    _css_class_weekday: list[str] = field(init=False, repr=False)
     features: list[Feature] = field(default_factory=list)
+    _feature_matrix: Optional[FeatureMatrix] = field(
+        init=False, repr=False, default=None
+    )
+    _months: dict[int, str] = field(init=False, repr=False, default_factory=dict)
+    fragment_cache: Optional[cache.FragmentCache] = field(default=None, repr=False)
+    _fragment_digest: Optional[str] = field(init=False, repr=False, default=None)
 
     def __post_init__(self):
         self._cal = Calendar(self.user_config.year)
-        self.env = init_jinja_env(self.user_config.template_search_path)
+        self._year_table = year_table(self.user_config.year)
+        self._css_class_weekday = [
+            " ".join(
+                [
+                    self.config.css_class["weekend" if weekday > 4 else "weekday"],
+                    self.config.day_abbr[weekday].lower(),
+                ]
+            )
+            for weekday in range(7)
+        ]
+        self._load_templates()
         base_features = [
             DayNumberFeature(css_class=[self.config.css_class["day_number"]]),
             DayAbbrFeature(
@@ -97,34 +149,121 @@ class MasterCalendar:
         ]
         self.features = base_features + self.features
 
+    def _load_templates(self):
+        """Resolves the calendar templates."""
+        self.env = get_jinja_env(self.user_config.template_search_path)
+        self.templates = {
+            key: self.env.get_template(name)
+            for key, name in self.config.templates.items()
+        }
+
+    def __getstate__(self) -> dict:
+        """Returns the calendar state without the Jinja environment and templates."""
+        state = self.__dict__.copy()
+        del state["env"], state["templates"]
+        return state
+
+    def __setstate__(self, state: dict):
+        """Restores the calendar state, resolving the templates again."""
+        self.__dict__.update(state)
+        self._load_templates()
+
     def format_year(self):
         """Returns the HTML for the whole year."""
-        template = self.env.get_template(self.config.templates["year"])
-        html = template.render(cal=self)
-        return html
+        return "".join(self.generate_year())
+
+    def generate_year(self) -> Iterator[str]:
+        """Yields the HTML for the whole year, chunk by chunk."""
+        template = self.templates["year"]
+        return template.generate(cal=self)
+
+    def fragment_key(self, *parts: object) -> str:
+        """Returns the cache key of a fragment of the calendar.
+
+        The key depends on the library, the templates, the HTML configuration,
+        the year and ``parts``, which identify the fragment and the data it shows.
+        """
+        if self._fragment_digest is None:
+            self._fragment_digest = cache.digest(
+                cache.library_digest(),
+                cache.templates_digest(self.env),
+                self.config.css_class,
+                self.config.day_abbr,
+                self.config.month_name,
+                self.config.templates,
+                self.config.output_format,
+                self.user_config.year,
+            )
+        return cache.digest(self._fragment_digest, *parts)
 
     def format_month(self, month: int) -> str:
-        """Returns the HTML for a specific month."""
-        template = self.env.get_template(self.config.templates["month"])
+        """Returns the HTML for a specific month.
+
+        With a fragment cache, the month is rendered only if its cells changed
+        since it was cached.
+        """
+        if month in self._months:
+            return self._months.pop(month)
+        if self.fragment_cache is None:
+            return self._render_month(month)
+        year = self.user_config.year
+        first = date(year, month, 1)
+        last = date(year, month, calendar.monthrange(year, month)[1])
+        key = self.fragment_key("month", month, self.cells_digest(first, last))
+        return self.fragment_cache.get_or_render(key, lambda: self._render_month(month))
+
+    def cells_digest(self, first: date, last: date) -> str:
+        """Returns the digest of the feature cells from ``first`` to ``last``.
+
+        The digest is computed from the feature fingerprints, without evaluating
+        the cells, unless a feature cannot provide one.
+        """
+        fingerprints = [feature.fingerprint(first, last) for feature in self.features]
+        if any(fingerprint is None for fingerprint in fingerprints):
+            return self.feature_matrix().digest(first, last)
+        return cache.digest(*fingerprints)
+
+    def _render_month(self, month: int) -> str:
+        """Renders the HTML for a specific month."""
+        template = self.templates["month"]
         html = template.render(
             month_name=self.config.month_name[month],
             month_id=month,
             cal=self._cal,
             format_week=self.format_week,
         )
-        soup = bs4.BeautifulSoup(html, features="html.parser")
-        return soup.prettify()
+        if self.config.output_format == "pretty":
+            return prettify(html)
+        return html
 
     def format_week(self, week: list[date]) -> str:
         """Returns the HTML for a specific week."""
-        template = self.env.get_template(self.config.templates["week"])
+        template = self.templates["week"]
         html = template.render(
-            week_id=week[0].weekid(),
+            week_id=self._year_table.week[self._year_table.index(week[0])],
             week=week,
             master=self,
         )
         return html
 
+    def feature_matrix(self) -> FeatureMatrix:
+        """Returns the cells of every feature for the calendar year, computed once."""
+        if self._feature_matrix is None:
+            self._feature_matrix = FeatureMatrix.build(
+                self.features, self.user_config.year
+            )
+        return self._feature_matrix
+
+    def format_features(self, day: date) -> list[tuple[str, str]]:
+        """Returns the HTML attributes and text of every feature cell for a day."""
+        matrix = self.feature_matrix()
+        if day in matrix:
+            return matrix.row(day)
+        return [
+            (feat.format_attrs(day), feat.format_text(day).strip())
+            for feat in self.features
+        ]
+
     def get_weekend_weekday_css_class(self, day: date) -> str:
         """Returns the weekend or weekday css specific class."""
         if day.is_weekend():
@@ -137,11 +276,15 @@ class MasterCalendar:
 
     def get_css_class_date(self, day: date) -> str:
         """Returns css classes for a specific day."""
-        css = [
-            self.get_weekend_weekday_css_class(day),
-            self.get_weekday_css_class(day),
-        ]
-        return " ".join(css)
+        if day.year != self._year_table.year:
+            return " ".join(
+                [
+                    self.get_weekend_weekday_css_class(day),
+                    self.get_weekday_css_class(day),
+                ]
+            )
+        table = self._year_table
+        return self._css_class_weekday[table.weekday[table.index(day)]]
 
     def get_css_class_week_number(self) -> str:
         """Returns css classes for the week number column."""
@@ -149,7 +292,19 @@ class MasterCalendar:
 
     def format_legend(self, events: Iterable[Event]) -> str:
         """Returns the legend for the calendar."""
-        template = self.env.get_template(self.config.templates["legend"])
+        events = list(events)
+        if self.fragment_cache is None:
+            return self._render_legend(events)
+        key = self.fragment_key(
+            "legend", [(event.name, event.css_class) for event in events]
+        )
+        return self.fragment_cache.get_or_render(
+            key, lambda: self._render_legend(events)
+        )
+
+    def _render_legend(self, events: list[Event]) -> str:
+        """Renders the legend for the calendar."""
+        template = self.templates["legend"]
         html = template.render(
             master=self,
             features=events,
@@ -157,39 +312,194 @@ class MasterCalendar:
         )
         return html
 
-    def render(self) -> str:
+    def render_months(self, executor: concurrent.futures.Executor, tasks: int):
+        """Renders the months in ``executor``, split in ``tasks`` tasks.
+
+        The rendered months are used by the next rendering of the year. With a
+        process pool, the calendar is pickled with its feature matrix and its
+        templates are resolved again in the worker.
+        """
+        self.feature_matrix()
+        months = list(self.config.month_name)
+        futures = [
+            executor.submit(_format_months, self, months[position::tasks])
+            for position in range(min(tasks, len(months)))
+        ]
+        for future in futures:
+            self._months.update(future.result())
+
+    def render(self, parallel: int = 1) -> str:
         """Renders the whole calendar.
 
-        Arguments:
-            events: The events to display on the calendar (i.e. public & school holidays.
-            comments: Comments to display on the calendar in HTML format.
+        With ``parallel`` greater than 1, months are rendered by that many processes.
+        The result is the same as the sequential rendering.
+        """
+        return "".join(self.generate(parallel))
+
+    def generate(self, parallel: int = 1) -> Iterator[str]:
+        """Renders the whole calendar, chunk by chunk.
+
+        Chunks are produced as the templates are evaluated, one month at a time, so
+        they can be written out before the rest of the calendar is rendered.
+        With ``parallel`` greater than 1, months are rendered by that many processes
+        before the first chunk is produced.
         """
+        if parallel > 1:
+            import concurrent.futures  # pylint: disable=import-outside-toplevel
+
+            with concurrent.futures.ProcessPoolExecutor(parallel) as executor:
+                self.render_months(executor, parallel)
         events = self.user_config.events
-        template = self.env.get_template(self.config.templates["main"])
-        html = template.render(
+        template = self.templates["main"]
+        chunks = template.generate(
             html_legend=self.format_legend(events),
-            html_calendar=self.format_year(),
+            html_calendar=self.generate_year(),
             html_comments=self.user_config.comments_html,
             this_year=self.user_config.year,
         )
-        return html
+        if self.config.output_format == "minified":
+            return minify(chunks)
+        return chunks
+
 
+def init_jinja_env(
+    template_search_path: os.PathLike,
+    bytecode_cache_dir: Optional[os.PathLike] = None,
+) -> jinja2.Environment:
+    """Returns a new Jinja environment for the templates in ``template_search_path``.
 
-def init_jinja_env(template_search_path: os.PathLike) -> jinja2.Environment:
+    Compiled templates are stored in ``bytecode_cache_dir``, or in a per-user
+    temporary directory if it is ``None``, and reused by later processes as long as
+    the template source is unchanged.
+    """
+    import jinja2  # pylint: disable=import-outside-toplevel  # slow to import
+
+    if bytecode_cache_dir is not None:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
     env = jinja2.Environment(
         loader=jinja2.FileSystemLoader(template_search_path),
         autoescape=jinja2.select_autoescape(["html", "xml"]),
         trim_blocks=True,
         lstrip_blocks=True,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(bytecode_cache_dir),
     )
     return env
 
 
-def create_calendar(config: UserConfiguration) -> MasterCalendar:
-    """Creates the calendar for the current year."""
+def get_jinja_env(template_search_path: os.PathLike) -> jinja2.Environment:
+    """Returns the Jinja environment shared by all calendars using the same templates."""
+    return _get_jinja_env(os.path.abspath(template_search_path))
+
+
+@functools.cache
+def _get_jinja_env(template_search_path: str) -> jinja2.Environment:
+    return init_jinja_env(template_search_path)
+
+
+def _format_months(cal: MasterCalendar, months: list[int]) -> dict[int, str]:
+    """Returns the HTML of several months of a calendar."""
+    return {month: cal.format_month(month) for month in months}
+
+
+def create_calendar(
+    config: UserConfiguration,
+    html_config: Optional[HTMLConfiguration] = None,
+    fragment_cache: Optional[cache.FragmentCache] = None,
+) -> MasterCalendar:
+    """Creates the calendar for the current year.
+
+    With a ``fragment_cache``, only the months and legend whose inputs changed since
+    a previous build are rendered.
+    """
     features = [
         merge_features([config.school_holidays, config.public_holidays]),
-        CustodyFeature(config.school_holidays),
+        CustodyFeature(
+            config.school_holidays, config.custody_overrides, config.custody_rules
+        ),
     ]
-    cal = MasterCalendar(config, features=features)
+    cal = MasterCalendar(
+        config,
+        features=features,
+        config=html_config or HTMLConfiguration(),
+        fragment_cache=fragment_cache,
+    )
     return cal
+
+
+def prettify(html: str) -> str:
+    """Returns an HTML fragment reformatted by BeautifulSoup."""
+    import bs4  # pylint: disable=import-outside-toplevel  # only for pretty output
+
+    return bs4.BeautifulSoup(html, features="html.parser").prettify()
+
+
+# Whitespace next to these tags is not rendered and is dropped when minifying.
+_BLOCK_TAGS = frozenset(
+    "html head body title meta link style div table thead tbody tfoot tr td th"
+    " p h1 h2 h3 h4 h5 h6 ul ol li hr br blockquote".split()
+)
+
+# The content of these elements is kept as is when minifying.
+_PRESERVED_TAGS = frozenset(["pre", "textarea", "script"])
+
+_HTML_TOKEN = re.compile(r"<!--.*?-->|<[^>]*>|[^<]+|<", re.DOTALL)
+_HTML_TAG_NAME = re.compile(r"</?\s*([^\s/>]+)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def minify(chunks: Iterable[str]) -> Iterator[str]:
+    """Collapses the whitespace of an HTML document, chunk by chunk.
+
+    Runs of whitespace become a single space, whitespace next to block-level tags
+    is dropped and comments are removed. The content of ``pre``, ``textarea`` and
+    ``script`` elements is kept as is. Tags split across chunks are buffered until
+    they are complete.
+    """
+    buffer = ""
+    space_pending = False
+    previous_block = True
+    preserved = None
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            text, buffer = buffer, ""
+        else:
+            buffer += chunk
+            cut = buffer.rfind("<")
+            if cut != -1 and ">" not in buffer[cut:]:
+                text, buffer = buffer[:cut], buffer[cut:]
+            else:
+                text, buffer = buffer, ""
+
+        output = []
+        for token in _HTML_TOKEN.findall(text):
+            is_tag = token.startswith("<") and len(token) > 1
+            if preserved is not None:
+                output.append(token)
+                if is_tag and token.lower().startswith(f"</{preserved}"):
+                    preserved = None
+                continue
+            if not is_tag:
+                collapsed = _WHITESPACE.sub(" ", token)
+                if not collapsed.strip():
+                    space_pending = True
+                    continue
+                if (space_pending or collapsed[0] == " ") and not previous_block:
+                    output.append(" ")
+                output.append(collapsed.strip())
+                space_pending = collapsed[-1] == " "
+                previous_block = False
+                continue
+            if token.startswith("<!--"):
+                continue
+            match = _HTML_TAG_NAME.match(token)
+            name = match.group(1).lower() if match else ""
+            is_block = name in _BLOCK_TAGS or name.startswith("!")
+            if space_pending and not (is_block or previous_block):
+                output.append(" ")
+            space_pending = False
+            previous_block = is_block
+            output.append(token)
+            if name in _PRESERVED_TAGS and not token.startswith("</"):
+                preserved = name
+        if output:
+            yield "".join(output)
@@ -1,14 +1,18 @@
 """kaloot.io - Defines kaloot's input/output functions."""
 
+import dataclasses
+import functools
+import hashlib
 import os
 import pathlib
-from typing import Optional
-
-import markdown
-import yaml
+import pickle
+from typing import Any, Iterable, Optional
 
+from . import cache
+from .date import date, date_range
 from .event import Event
 from .config import UserConfiguration
+from .rules import CustodyRules
 
 
 def read_comments_markdown(path: Optional[os.PathLike]) -> str:
@@ -21,13 +25,95 @@ def read_comments_markdown(path: Optional[os.PathLike]) -> str:
     check_file_exists(path)
     with open(path, "rt", encoding="utf-8") as input_file:
         text = input_file.read()
-    return markdown.markdown(text)
+    return markdown_to_html(text)
 
 
-def read_configuration_file(path: os.PathLike) -> UserConfiguration:
-    """Reads the YAML configuration file"""
-    with open(path, "rt", encoding="utf-8") as input_file:
-        config = yaml.load(input_file, Loader=yaml.Loader)
+@functools.lru_cache(maxsize=128)
+def markdown_to_html(text: str) -> str:
+    """Returns markdown text formatted in HTML.
+
+    Conversions are cached by content, so configurations sharing a comments file
+    convert it once per process.
+    """
+    converter = _markdown_converter()
+    try:
+        return converter.convert(text)
+    finally:
+        converter.reset()
+
+
+@functools.cache
+def _markdown_converter():
+    """Returns the markdown converter, created on first use."""
+    import markdown  # pylint: disable=import-outside-toplevel  # only for comments
+
+    return markdown.Markdown()
+
+
+def read_configuration_file(
+    path: os.PathLike, cache_dir: Optional[os.PathLike] = None
+) -> UserConfiguration:
+    """Reads the YAML configuration file
+
+    With a ``cache_dir``, the parsed configuration is stored in its ``config``
+    subdirectory, keyed by the content of the file, and reused as long as neither
+    the file nor its comments file changed.
+    """
+    with open(path, "rb") as input_file:
+        data = input_file.read()
+    if cache_dir is None:
+        return parse_configuration(data)
+
+    # Relative template and comments paths depend on the working directory.
+    key = cache.digest(
+        cache.library_digest(), os.getcwd(), hashlib.sha256(data).hexdigest()
+    )
+    cache_path = pathlib.Path(cache_dir) / "config" / f"{key}.pickle"
+    config = _load_cached_configuration(cache_path)
+    if config is None:
+        config = parse_configuration(data)
+        _store_cached_configuration(cache_path, config)
+    return config
+
+
+def _comments_digest(config: UserConfiguration) -> Optional[str]:
+    """Returns the digest of the comments file of a configuration."""
+    if config.comments_path is None:
+        return None
+    return hashlib.sha256(config.comments_path.read_bytes()).hexdigest()
+
+
+def _load_cached_configuration(cache_path: pathlib.Path) -> Optional[UserConfiguration]:
+    """Returns the configuration stored in ``cache_path``, ``None`` if it is outdated."""
+    try:
+        with open(cache_path, "rb") as input_file:
+            fields, comments_digest = pickle.load(input_file)
+        config = UserConfiguration(**fields)
+        if _comments_digest(config) != comments_digest:
+            return None
+    except (OSError, EOFError, pickle.PickleError, TypeError, ValueError):
+        return None
+    check_directory_exists(config.template_search_path)
+    return config
+
+
+def _store_cached_configuration(cache_path: pathlib.Path, config: UserConfiguration):
+    """Stores a configuration in ``cache_path``."""
+    fields = {
+        field.name: getattr(config, field.name)
+        for field in dataclasses.fields(config)
+        if field.init
+    }
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as output_file:
+        pickle.dump((fields, _comments_digest(config)), output_file)
+    os.replace(tmp_path, cache_path)
+
+
+def parse_configuration(data: str | bytes) -> UserConfiguration:
+    """Parses the content of a YAML configuration file."""
+    config = _load_yaml(data)
 
     if "year" not in config:
         raise KeyError("Missing 'year' in configuration file")
@@ -49,18 +135,94 @@ def read_configuration_file(path: os.PathLike) -> UserConfiguration:
         event_data=config["Vacances scolaires"],
     )
 
+    config["custody_rules"] = CustodyRules.from_dict(config.get("custody_rules") or {})
+    config["custody_overrides"] = read_custody_overrides(
+        config.get("custody_overrides") or {}, config["year"], config["custody_rules"]
+    )
+
     return UserConfiguration(
         year=config["year"],
         template_search_path=config["template_dir"],
         comments_html=config["comments_html"],
         school_holidays=config["school_holidays"],
+        custody_overrides=config["custody_overrides"],
+        comments_path=(
+            pathlib.Path(config["comments"]) if config.get("comments") else None
+        ),
+        custody_rules=config["custody_rules"],
     )
 
 
-def write_html(path: os.PathLike, html: str):
-    """Writes the HTML calendar to a file."""
+def _load_yaml(data: str | bytes) -> Any:
+    """Parses YAML with libyaml, or the pure-Python parser if it is not available."""
+    import yaml  # pylint: disable=import-outside-toplevel  # slow to import
+
+    try:
+        loader = yaml.CSafeLoader
+    except AttributeError:  # PyYAML built without libyaml
+        loader = yaml.SafeLoader
+    return yaml.load(data, Loader=loader)
+
+
+def read_custody_overrides(
+    overrides: dict[str, str], year: int, rules: Optional[CustodyRules] = None
+) -> dict[date, str]:
+    """Reads the custody overrides of the configuration file.
+
+    Overrides map a date or a date range to the guardian for these days, e.g.::
+
+        custody_overrides:
+          25/12: B
+          26/12 - 28/12: L
+
+    Guardians must be one of the guardians of the custody ``rules``, or a
+    transition between them, e.g. ``L→B`` or ``L->B``.
+    """
+    if not isinstance(overrides, dict):
+        raise ValueError("'custody_overrides' must map dates to guardians")
+    allowed = (rules or CustodyRules()).day_guardians()
+    days = {}
+    for datestr, guardian in overrides.items():
+        if isinstance(guardian, str):
+            guardian = guardian.replace("->", "→")
+        if not isinstance(guardian, str) or guardian not in allowed:
+            raise ValueError(
+                f"custody_overrides: {datestr}: invalid guardian {guardian!r},"
+                f" expected one of {', '.join(sorted(allowed))}"
+            )
+        if "-" in datestr:
+            for day in date_range.from_string(datestr, year):
+                days[day] = guardian
+        else:
+            days[date.from_string(datestr, year)] = guardian
+    return days
+
+
+def write_html(path: os.PathLike, html: str | Iterable[str], atomic: bool = True):
+    """Writes the HTML calendar to a file.
+
+    ``html`` is either the whole document or an iterable of chunks, e.g.
+    ``MasterCalendar.generate()``. Chunks are written as they are produced.
+    With ``atomic``, the default, the document is written to a temporary file in
+    the same directory which then replaces ``path``: readers never see a partial
+    calendar, and the previous one is kept if producing a chunk fails.
+    """
+    if atomic:
+        tmp_path = f"{os.fspath(path)}.{os.getpid()}.tmp"
+        try:
+            write_html(tmp_path, html, atomic=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return
     with open(path, "wt", encoding="utf-8") as output_file:
-        output_file.write(html)
+        if isinstance(html, str):
+            output_file.write(html)
+            return
+        for chunk in html:
+            output_file.write(chunk)
 
 
 def check_file_exists(path: os.PathLike):
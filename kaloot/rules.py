@@ -0,0 +1,425 @@
+"""kaloot.rules - Declarative custody rules compiled to lookup tables.
+
+The custody arrangement is described by ``CustodyRules``, read from the
+``custody_rules`` section of the configuration file::
+
+    custody_rules:
+      guardians: [B, L]
+      weeks:
+        even: [L, L→B, B→L, L, L→B, B, B]
+        odd: [B, B, B, B, B→L, L, L]
+      before_holidays: {even: L, odd: B}
+      holidays:
+        first: {even_year: L, odd_year: B}
+        transition: first_saturday
+        summer_transition: half
+        summer_months: [6, 7]
+        january_swap: true
+      special_days: {fathers_day: B, mothers_day: L}
+
+Week patterns list the guardian from Monday to Sunday for even and odd ISO weeks,
+transitions are written ``L→B`` or ``L->B``. Every entry is optional and defaults
+to the arrangement of ``kaloot.custody``.
+
+The rules are compiled once into ``CompiledRules``: guardians by (week parity,
+weekday), the guardian on the day before holidays by (week parity, holiday
+guardian) and the holiday guardians by year parity. Solving a year fills the
+regular weeks from the tables, then each holiday period by slices.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import functools
+import sys
+from typing import Any, Callable, Mapping, Optional
+
+from .calendar import fathers_day, mothers_day, year_table
+from .custody import (
+    CustodyTimeline,
+    HolidayIndex,
+    guardian_transition,
+    split_transition,
+)
+from .date import date, date_collection, date_range
+
+# Returns the transition day of the holidays from their first and last days.
+TRANSITION_POLICIES: dict[str, Callable[[date, date], date]] = {
+    "first_saturday": lambda first, last: first.next_saturday(),
+    "half": lambda first, last: date_range(first, last).half().previous(),
+}
+
+WEEK_PARITIES = ("even", "odd")
+
+# Keys of the ``custody_rules`` section, by path of their section.
+RULES_KEYS: dict[str, tuple[str, ...]] = {
+    "": ("guardians", "weeks", "before_holidays", "holidays", "special_days"),
+    "weeks": WEEK_PARITIES,
+    "before_holidays": WEEK_PARITIES,
+    "holidays": (
+        "first",
+        "transition",
+        "summer_transition",
+        "summer_months",
+        "january_swap",
+    ),
+    "holidays: first": ("even_year", "odd_year"),
+    "special_days": ("fathers_day", "mothers_day"),
+}
+
+
+@dataclass(frozen=True)
+class CustodyRules:
+    """Stores a custody arrangement.
+
+    Week patterns hold the guardian of each day from Monday to Sunday, in even
+    and odd ISO weeks. The guardian before holidays keeps the children until the
+    holidays start. During holidays, the first guardian depends on the year parity
+    and hands over on the day given by the transition policy.
+    """
+
+    guardians: tuple[str, str] = ("B", "L")
+    even_week: tuple[str, ...] = ("L", "L→B", "B→L", "L", "L→B", "B", "B")
+    odd_week: tuple[str, ...] = ("B", "B", "B", "B", "B→L", "L", "L")
+    even_week_before_holidays: str = "L"
+    odd_week_before_holidays: str = "B"
+    even_year_holidays_first: str = "L"
+    odd_year_holidays_first: str = "B"
+    transition: str = "first_saturday"
+    summer_transition: str = "half"
+    summer_months: tuple[int, ...] = (6, 7)
+    january_swap: bool = True
+    fathers_day: Optional[str] = "B"
+    mothers_day: Optional[str] = "L"
+
+    def __post_init__(self):
+        self.validate()
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> CustodyRules:
+        """Returns the rules of the ``custody_rules`` section of a configuration."""
+        if not isinstance(data, Mapping):
+            raise ValueError("custody_rules: expected a mapping")
+        _check_keys(data, RULES_KEYS[""], "custody_rules")
+        weeks = _section(data, "weeks")
+        before = _section(data, "before_holidays")
+        holidays = _section(data, "holidays")
+        first = _section(holidays, "first", "holidays: first")
+        special_days = _section(data, "special_days")
+
+        kwargs: dict[str, Any] = {}
+        if "guardians" in data:
+            kwargs["guardians"] = tuple(_guardians(data["guardians"]))
+        for parity in WEEK_PARITIES:
+            if parity in weeks:
+                kwargs[f"{parity}_week"] = tuple(_guardians(weeks[parity]))
+            if parity in before:
+                kwargs[f"{parity}_week_before_holidays"] = _guardian(before[parity])
+            if f"{parity}_year" in first:
+                kwargs[f"{parity}_year_holidays_first"] = _guardian(
+                    first[f"{parity}_year"]
+                )
+        for key in ["transition", "summer_transition"]:
+            if key in holidays:
+                kwargs[key] = str(holidays[key])
+        if "summer_months" in holidays:
+            kwargs["summer_months"] = tuple(int(m) for m in holidays["summer_months"])
+        if "january_swap" in holidays:
+            kwargs["january_swap"] = bool(holidays["january_swap"])
+        for key in ["fathers_day", "mothers_day"]:
+            if key in special_days:
+                value = special_days[key]
+                kwargs[key] = None if value is None else _guardian(value)
+        return cls(**kwargs)
+
+    def validate(self):
+        """Raises ``ValueError`` if the rules are inconsistent."""
+        if len(self.guardians) != 2 or len(set(self.guardians)) != 2:
+            raise ValueError("custody_rules: expected two different guardians")
+        days = self.day_guardians()
+        for parity in WEEK_PARITIES:
+            week = getattr(self, f"{parity}_week")
+            if len(week) != 7:
+                raise ValueError(f"custody_rules: {parity} week: expected 7 days")
+            for guardian in week:
+                if guardian not in days:
+                    raise ValueError(
+                        f"custody_rules: {parity} week: invalid guardian {guardian!r}"
+                    )
+        for name in [
+            "even_week_before_holidays",
+            "odd_week_before_holidays",
+            "even_year_holidays_first",
+            "odd_year_holidays_first",
+        ]:
+            if getattr(self, name) not in self.guardians:
+                raise ValueError(
+                    f"custody_rules: {name}: invalid guardian {getattr(self, name)!r}"
+                )
+        for name in ["fathers_day", "mothers_day"]:
+            guardian = getattr(self, name)
+            if guardian is not None and guardian not in self.guardians:
+                raise ValueError(
+                    f"custody_rules: {name}: invalid guardian {guardian!r}"
+                )
+        for name in ["transition", "summer_transition"]:
+            if getattr(self, name) not in TRANSITION_POLICIES:
+                raise ValueError(
+                    f"custody_rules: {name}: unknown policy {getattr(self, name)!r},"
+                    f" expected one of {', '.join(TRANSITION_POLICIES)}"
+                )
+        if not all(1 <= month <= 12 for month in self.summer_months):
+            raise ValueError("custody_rules: summer_months: invalid month")
+
+    def day_guardians(self) -> frozenset[str]:
+        """Returns the guardians and the transitions between them, e.g. ``L→B``."""
+        first, second = self.guardians
+        return frozenset(
+            [
+                first,
+                second,
+                guardian_transition(first, second),
+                guardian_transition(second, first),
+            ]
+        )
+
+    def compile(self) -> CompiledRules:
+        """Returns the rules compiled to lookup tables. Compiled once per rules."""
+        return _compile(self)
+
+
+def _section(
+    data: Mapping[str, Any], key: str, name: Optional[str] = None
+) -> Mapping[str, Any]:
+    """Returns a section of the rules, empty if it is missing.
+
+    ``name`` is the path of the section in error messages, ``key`` by default.
+    """
+    name = name or key
+    section = data.get(key) or {}
+    if not isinstance(section, Mapping):
+        raise ValueError(f"custody_rules: {name}: expected a mapping")
+    _check_keys(section, RULES_KEYS[name], f"custody_rules: {name}")
+    return section
+
+
+def _check_keys(data: Mapping[str, Any], keys: tuple[str, ...], name: str):
+    """Raises ``ValueError`` if a key of ``data`` is not one of ``keys``."""
+    for key in data:
+        if key not in keys:
+            raise ValueError(
+                f"{name}: unknown key {key!r}, expected one of {', '.join(keys)}"
+            )
+
+
+def _guardian(value: Any) -> str:
+    """Returns a guardian or a transition, with ``->`` written as ``→``."""
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"custody_rules: invalid guardian {value!r}")
+    return sys.intern(value.replace("->", "→").replace(" ", ""))
+
+
+def _guardians(values: Any) -> list[str]:
+    """Returns a list of guardians."""
+    if not isinstance(values, list):
+        raise ValueError(f"custody_rules: expected a list of guardians, got {values!r}")
+    return [_guardian(value) for value in values]
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """Stores custody rules as lookup tables.
+
+    Tables indexed by week parity use 0 for even weeks and 1 for odd weeks, tables
+    indexed by year parity use 0 for even years and 1 for odd years.
+    """
+
+    rules: CustodyRules
+    # Guardian by week parity and weekday.
+    weeks: tuple[tuple[str, ...], tuple[str, ...]] = field(repr=False)
+    # Guardian on the day before holidays by week parity and holiday guardian.
+    before_holidays: tuple[dict[str, str], dict[str, str]] = field(repr=False)
+    # First and second holiday guardians by year parity.
+    holidays: tuple[tuple[str, str], tuple[str, str]] = field(repr=False)
+
+    def holiday_pair(self, year: int) -> tuple[str, str]:
+        """Returns the first and second holiday guardians of a year."""
+        return self.holidays[year & 1]
+
+    def transition_day(self, first: date, last: date) -> date:
+        """Returns the transition day of the holidays from ``first`` to ``last``."""
+        if first.month in self.rules.summer_months:
+            return TRANSITION_POLICIES[self.rules.summer_transition](first, last)
+        return TRANSITION_POLICIES[self.rules.transition](first, last)
+
+    def regular_guardian(self, day: date) -> str:
+        """Returns the guardian of a day from the week patterns alone."""
+        table = year_table(day.year)
+        index = table.index(day)
+        return self.weeks[table.parity[index]][table.weekday[index]]
+
+    def holiday_guardian(self, day: date, holidays: date_range) -> str:
+        """Returns the guardian on a day of the ``holidays`` period."""
+        first, second = self.holiday_pair(day.year)
+        transition = self.transition_day(holidays.start, holidays.end)
+        if day < transition:
+            return first
+        if day == transition:
+            return guardian_transition(first, second)
+        if self.rules.january_swap and day.month == 1:
+            first, second = second, first
+        if day == holidays.end:
+            giver, _ = split_transition(self.regular_guardian(day.next()))
+            if giver != second:
+                return guardian_transition(second, first)
+        return second
+
+    def scheduled_guardian(
+        self, day: date, holidays: date_collection | HolidayIndex
+    ) -> str:
+        """Returns the guardian of a day, leaving special days aside."""
+        holidays = HolidayIndex.of(holidays)
+        period = holidays.find_range(day)
+        if period is not None:
+            return self.holiday_guardian(day, period)
+        next_period = holidays.find_range(day.next())
+        if next_period is not None:
+            table = year_table(day.year)
+            parity = table.parity[table.index(day)]
+            return self.before_holidays[parity][
+                self.holiday_guardian(day.next(), next_period)
+            ]
+        return self.regular_guardian(day)
+
+    def fixed_guardians(
+        self, year: int, overrides: Optional[Mapping[date, str]] = None
+    ) -> dict[date, str]:
+        """Returns the special days and ``overrides`` of a year, with their guardian."""
+        fixed = {}
+        if self.rules.fathers_day is not None:
+            fixed[fathers_day(year)] = self.rules.fathers_day
+        if self.rules.mothers_day is not None:
+            fixed[mothers_day(year)] = self.rules.mothers_day
+        fixed.update(
+            (day, guardian)
+            for day, guardian in (overrides or {}).items()
+            if day.year == year
+        )
+        return fixed
+
+    def guardian(
+        self,
+        day: date,
+        holidays: date_collection | HolidayIndex,
+        overrides: Optional[Mapping[date, str]] = None,
+    ) -> str:
+        """Returns the guardian of a day."""
+        fixed = self.fixed_guardians(day.year, overrides)
+        if day in fixed:
+            return fixed[day]
+        return self.scheduled_guardian(day, holidays)
+
+    def solve_year(
+        self,
+        year: int,
+        holidays: date_collection | HolidayIndex,
+        overrides: Optional[Mapping[date, str]] = None,
+    ) -> CustodyTimeline:
+        """Returns the guardian of every day of the year."""
+        holidays = HolidayIndex.of(holidays)
+        table = year_table(year)
+        origin, size = table.first_ordinal, len(table)
+        weeks = self.weeks
+        guardians = [
+            weeks[parity][weekday]
+            for parity, weekday in zip(table.parity, table.weekday)
+        ]
+        is_holiday = bytearray(size)
+
+        # The first day of next year is included for the day before its holidays.
+        segments = list(
+            holidays.iter_segments(
+                date.fromordinal(origin), date.fromordinal(origin + size)
+            )
+        )
+        first, second = self.holiday_pair(year)
+        handover = guardian_transition(first, second)
+        for start, end, period in segments:
+            start, end = start - origin, min(end - origin, size - 1)
+            if start >= size:
+                continue
+            is_holiday[start : end + 1] = b"\x01" * (end - start + 1)
+            self._fill_holidays(guardians, origin, start, end, period, handover)
+
+        for start, _, period in segments:
+            index = start - origin - 1
+            if 0 <= index < size and not is_holiday[index]:
+                day = date.fromordinal(start)
+                guardian = self.holiday_guardian(day, period)
+                parity = table.parity[index]
+                guardians[index] = self.before_holidays[parity][guardian]
+
+        for day, guardian in self.fixed_guardians(year, overrides).items():
+            guardians[day.toordinal() - origin] = guardian
+        return CustodyTimeline(year, tuple(guardians))
+
+    def _fill_holidays(
+        self,
+        guardians: list[str],
+        origin: int,
+        start: int,
+        end: int,
+        period: date_range,
+        handover: str,
+    ):
+        """Sets the guardians of the days ``start`` to ``end`` of a holiday period.
+
+        Days are indexes in the year starting at ``origin``, all in the same year.
+        """
+        first, second = self.holiday_pair(date.fromordinal(origin).year)
+        transition = self.transition_day(period.start, period.end).toordinal() - origin
+        before_end = min(end, transition - 1)
+        if start <= before_end:
+            guardians[start : before_end + 1] = [first] * (before_end - start + 1)
+        if start <= transition <= end:
+            guardians[transition] = handover
+        after_start = max(start, transition + 1)
+        if after_start > end:
+            return
+        guardians[after_start : end + 1] = [second] * (end - after_start + 1)
+        if self.rules.january_swap:
+            # Days of January, i.e. the first 31 days of the year.
+            january_end = min(end, 30)
+            if after_start <= january_end:
+                guardians[after_start : january_end + 1] = [first] * (
+                    january_end - after_start + 1
+                )
+        last = period.end.toordinal() - origin
+        if after_start <= last <= end:
+            guardians[last] = self.holiday_guardian(period.end, period)
+
+
+@functools.cache
+def _compile(rules: CustodyRules) -> CompiledRules:
+    """Returns the lookup tables of custody rules."""
+    first, second = rules.guardians
+    other = {first: second, second: first}
+    values = [first, second, guardian_transition(first, second)]
+    values.append(guardian_transition(second, first))
+
+    before_holidays = []
+    for base in [rules.even_week_before_holidays, rules.odd_week_before_holidays]:
+        handover = guardian_transition(base, other[base])
+        before_holidays.append(
+            {value: base if value == base else handover for value in values}
+        )
+    holidays = (
+        (rules.even_year_holidays_first, other[rules.even_year_holidays_first]),
+        (rules.odd_year_holidays_first, other[rules.odd_year_holidays_first]),
+    )
+    return CompiledRules(
+        rules,
+        (rules.even_week, rules.odd_week),
+        (before_holidays[0], before_holidays[1]),
+        holidays,
+    )
@@ -0,0 +1,219 @@
+"""kaloot.site - Builds the calendar web site, with one directory per year.
+
+Each year directory contains the calendar, a copy of its configuration and comments
+files and an ``index.html`` link to the calendar. The top-level ``index.html`` links
+to the index of the current year, or of the latest year built.
+
+Usage::
+
+    python -m kaloot.site --years 2023-2027 --config-dir . --site-dir docs
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import re
+import shutil
+import sys
+from typing import Iterable, Optional
+
+from .cache import CACHE_DIR_HELP, FragmentCache
+from .date import current_year
+from .html import (
+    OUTPUT_FORMAT_HELP,
+    OUTPUT_FORMATS,
+    HTMLConfiguration,
+    create_calendar,
+)
+from .io import read_configuration_file, write_html
+
+CONFIG_FILE_PATTERN = re.compile(r"config-(\d{4})\.ya?ml")
+
+
+def parse_years(years: str) -> list[int]:
+    """Returns the years of a string like ``2023-2027`` or ``2023,2025``."""
+    result = []
+    for token in years.split(","):
+        if "-" in token:
+            first, last = (int(year) for year in token.split("-"))
+            result.extend(range(first, last + 1))
+        else:
+            result.append(int(token))
+    return sorted(set(result))
+
+
+def find_configuration_files(config_dir: os.PathLike) -> dict[int, pathlib.Path]:
+    """Returns the ``config-YYYY.yaml`` files of a directory, by year."""
+    configs = {}
+    for path in sorted(pathlib.Path(config_dir).iterdir()):
+        match = CONFIG_FILE_PATTERN.fullmatch(path.name)
+        if match and path.is_file():
+            configs[int(match.group(1))] = path
+    return configs
+
+
+def find_year_configuration_files(
+    years: Iterable[int], config_dir: os.PathLike, site_dir: os.PathLike
+) -> dict[int, pathlib.Path]:
+    """Returns the configuration file of each year.
+
+    A year's configuration is looked for in ``config_dir``, then in the year
+    directory of the site, where it was copied by a previous build.
+    """
+    configs = {}
+    for year in years:
+        candidates = [
+            pathlib.Path(config_dir) / f"config-{year}.yaml",
+            pathlib.Path(site_dir) / str(year) / f"config-{year}.yaml",
+        ]
+        for path in candidates:
+            if path.is_file():
+                configs[year] = path
+                break
+        else:
+            raise FileNotFoundError(f"No configuration file found for {year}")
+    return configs
+
+
+def copy_file(source: os.PathLike, directory: pathlib.Path):
+    """Copies a file into a directory, unless it is already there."""
+    destination = directory / pathlib.Path(source).name
+    if destination.exists() and os.path.samefile(source, destination):
+        return
+    shutil.copyfile(source, destination)
+
+
+def symlink(path: pathlib.Path, target: str):
+    """Creates a symbolic link, replacing any existing file."""
+    if path.is_symlink() or path.exists():
+        path.unlink()
+    path.symlink_to(target)
+
+
+def build_year(
+    config_path: os.PathLike,
+    site_dir: os.PathLike,
+    html_config: Optional[HTMLConfiguration] = None,
+    cache_dir: Optional[os.PathLike] = None,
+) -> pathlib.Path:
+    """Builds the directory of one year. Returns the path to the calendar.
+
+    With a ``cache_dir``, the parsed configuration and the rendered fragments of
+    previous builds are reused.
+    """
+    config = read_configuration_file(config_path, cache_dir)
+    fragment_cache = FragmentCache(cache_dir) if cache_dir is not None else None
+    year_dir = pathlib.Path(site_dir) / str(config.year)
+    year_dir.mkdir(parents=True, exist_ok=True)
+
+    calendar_path = year_dir / f"calendar-{config.year}.html"
+    write_html(
+        calendar_path, create_calendar(config, html_config, fragment_cache).generate()
+    )
+    copy_file(config_path, year_dir)
+    if config.comments_path is not None:
+        copy_file(config.comments_path, year_dir)
+    symlink(year_dir / "index.html", calendar_path.name)
+    return calendar_path
+
+
+def update_index(site_dir: os.PathLike, year: Optional[int] = None) -> int:
+    """Links the top-level index to the index of a year.
+
+    By default, the year is the current year if it was built, the latest year
+    built otherwise. Returns the year linked.
+    """
+    site_dir = pathlib.Path(site_dir)
+    if year is None:
+        built = [
+            int(path.name)
+            for path in site_dir.iterdir()
+            if path.name.isdigit() and (path / "index.html").exists()
+        ]
+        if not built:
+            raise FileNotFoundError(f"No year was built in '{site_dir}'")
+        year = current_year() if current_year() in built else max(built)
+    symlink(site_dir / "index.html", f"{year}/index.html")
+    return year
+
+
+def build_site(
+    configs: dict[int, pathlib.Path],
+    site_dir: os.PathLike,
+    html_config: Optional[HTMLConfiguration] = None,
+    index_year: Optional[int] = None,
+    cache_dir: Optional[os.PathLike] = None,
+) -> dict[int, pathlib.Path]:
+    """Builds the site for every year in ``configs``, then updates the index.
+
+    Returns the path to the calendar of each year.
+    """
+    calendars = {
+        year: build_year(config_path, site_dir, html_config, cache_dir)
+        for year, config_path in sorted(configs.items())
+    }
+    update_index(site_dir, index_year)
+    return calendars
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog="python -m kaloot.site")
+    parser.add_argument(
+        "--years",
+        help="The years to build, e.g. 2023-2027 (default: every config-YYYY.yaml"
+        " in the configuration directory)",
+        type=parse_years,
+    )
+    parser.add_argument(
+        "--config-dir",
+        help="The directory of the config-YYYY.yaml files (default: .)",
+        type=pathlib.Path,
+        default=pathlib.Path("."),
+    )
+    parser.add_argument(
+        "--site-dir",
+        help="The site directory (default: docs)",
+        type=pathlib.Path,
+        default=pathlib.Path("docs"),
+    )
+    parser.add_argument(
+        "--index-year",
+        help="The year the top-level index links to (default: the current year)",
+        type=int,
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help=OUTPUT_FORMAT_HELP,
+        choices=OUTPUT_FORMATS,
+        default="pretty",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=CACHE_DIR_HELP,
+        type=pathlib.Path,
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None):
+    """Main function"""
+    args = parse_args(argv)
+    if args.years is None:
+        configs = find_configuration_files(args.config_dir)
+    else:
+        configs = find_year_configuration_files(
+            args.years, args.config_dir, args.site_dir
+        )
+    html_config = HTMLConfiguration(output_format=args.format)
+    for year, calendar_path in build_site(
+        configs, args.site_dir, html_config, args.index_year, args.cache_dir
+    ).items():
+        print(f"{year}: wrote {calendar_path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""kaloot.stats - Counts the days spent with each guardian.
+
+Days are counted per year, per month and per holiday period, with the number of
+handovers. On a handover day, e.g. ``"L→B"``, each guardian gets half a day.
+"""
+
+from __future__ import annotations
+
+import collections
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional
+
+from .config import UserConfiguration
+from .custody import HolidayIndex, iter_guardians, split_transition
+from .date import date, date_collection
+from .rules import CustodyRules
+
+
+@dataclass
+class CustodyStats:
+    """Stores the days spent with each guardian and the number of handovers."""
+
+    days: dict[str, float] = field(
+        default_factory=lambda: collections.defaultdict(float)
+    )
+    handovers: int = 0
+
+    def add(self, guardian: str):
+        """Counts a day with a guardian, or half a day with each one on a handover."""
+        giver, receiver = split_transition(guardian)
+        if giver == receiver:
+            self.days[guardian] += 1
+        else:
+            self.days[giver] += 0.5
+            self.days[receiver] += 0.5
+            self.handovers += 1
+
+    @property
+    def total(self) -> float:
+        """The number of days counted."""
+        return sum(self.days.values())
+
+    def balance(self) -> dict[str, float]:
+        """Returns the share of the days spent with each guardian, between 0 and 1."""
+        total = self.total
+        if not total:
+            return {}
+        return {guardian: days / total for guardian, days in sorted(self.days.items())}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the statistics as a JSON-serializable dictionary."""
+        return {
+            "days": dict(sorted(self.days.items())),
+            "handovers": self.handovers,
+            "balance": self.balance(),
+        }
+
+
+@dataclass
+class StatsReport:
+    """Stores the custody statistics from ``first`` to ``last``.
+
+    Holiday periods are keyed by their first and last days, cut to the report dates.
+    """
+
+    first: date
+    last: date
+    total: CustodyStats = field(default_factory=CustodyStats)
+    years: dict[int, CustodyStats] = field(default_factory=dict)
+    months: dict[tuple[int, int], CustodyStats] = field(default_factory=dict)
+    holidays: dict[tuple[date, date], CustodyStats] = field(default_factory=dict)
+
+    @property
+    def guardians(self) -> list[str]:
+        """The guardians of the report, sorted."""
+        return sorted(self.total.days)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the report as a JSON-serializable dictionary."""
+        return {
+            "first": self.first.isoformat(),
+            "last": self.last.isoformat(),
+            "total": self.total.to_dict(),
+            "years": {str(year): stats.to_dict() for year, stats in self.years.items()},
+            "months": {
+                f"{year}-{month:02d}": stats.to_dict()
+                for (year, month), stats in self.months.items()
+            },
+            "holidays": {
+                f"{first.isoformat()}/{last.isoformat()}": stats.to_dict()
+                for (first, last), stats in self.holidays.items()
+            },
+        }
+
+    def format_table(self) -> str:
+        """Returns the report as a text table, one section per level of detail."""
+        guardians = self.guardians
+        sections: list[Mapping[str, CustodyStats]] = [
+            {"total": self.total},
+            {str(year): stats for year, stats in self.years.items()},
+            {f"{y}-{m:02d}": stats for (y, m), stats in self.months.items()},
+            {
+                f"{first.strftime('%d/%m/%Y')} - {last.strftime('%d/%m/%Y')}": stats
+                for (first, last), stats in self.holidays.items()
+            },
+        ]
+        rows = [["", *guardians, "handovers"]]
+        separators = set()
+        for section in sections:
+            separators.add(len(rows))
+            for label, stats in section.items():
+                days = [f"{stats.days.get(guardian, 0):g}" for guardian in guardians]
+                rows.append([label, *days, str(stats.handovers)])
+
+        widths = [
+            max(len(row[column]) for row in rows) for column in range(len(rows[0]))
+        ]
+        lines = []
+        for position, row in enumerate(rows):
+            if position in separators:
+                lines.append("  ".join("-" * width for width in widths))
+            cells = [row[0].ljust(widths[0])]
+            cells += [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+            lines.append("  ".join(cells).rstrip())
+        return "\n".join(lines)
+
+
+def compute_stats(
+    first: date,
+    last: date,
+    holidays: date_collection | HolidayIndex,
+    overrides: Optional[Mapping[date, str]] = None,
+    rules: Optional[CustodyRules] = None,
+) -> StatsReport:
+    """Returns the custody statistics from ``first`` to ``last``.
+
+    Every day is counted once, in the total, its year, its month and its holiday
+    period, in a single pass over the custody timeline.
+    """
+    holidays = HolidayIndex.of(holidays)
+    report = StatsReport(first, last)
+    for day, guardian in iter_guardians(first, last, holidays, overrides, rules):
+        report.total.add(guardian)
+        year_stats = report.years.get(day.year)
+        if year_stats is None:
+            year_stats = report.years[day.year] = CustodyStats()
+        year_stats.add(guardian)
+        month_stats = report.months.get((day.year, day.month))
+        if month_stats is None:
+            month_stats = report.months[day.year, day.month] = CustodyStats()
+        month_stats.add(guardian)
+        period = holidays.find(day)
+        if period is not None:
+            key = (max(period.first, first), min(period.last, last))
+            holiday_stats = report.holidays.get(key)
+            if holiday_stats is None:
+                holiday_stats = report.holidays[key] = CustodyStats()
+            holiday_stats.add(guardian)
+    return report
+
+
+def compute_config_stats(config: UserConfiguration) -> StatsReport:
+    """Returns the custody statistics of the year of a user configuration."""
+    return compute_stats(
+        date(config.year, 1, 1),
+        date(config.year, 12, 31),
+        config.school_holidays.dates,
+        config.custody_overrides,
+        config.custody_rules,
+    )
@@ -0,0 +1,171 @@
+"""kaloot.watch - Regenerates a calendar when its input files change.
+
+The watcher polls the modification time of the configuration file, of the comments
+file and of the templates. Only the stages depending on the changed files are run
+again: the configuration is parsed again, the comments are converted again, or the
+templates are compiled again by the Jinja environment, which reloads outdated
+templates. The process stays warm between builds, so the imports, the Jinja
+environment, the public holidays and the year tables are loaded once.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from dataclasses import dataclass, field
+import os
+import pathlib
+import time
+from typing import Callable, Optional
+
+from .cache import FragmentCache
+from .config import UserConfiguration
+from .html import HTMLConfiguration, create_calendar
+from .io import read_comments_markdown, read_configuration_file, write_html
+
+Stamp = tuple[int, int]
+
+CONFIG = "config"
+COMMENTS = "comments"
+TEMPLATES = "templates"
+
+
+def stamp(path: os.PathLike) -> Optional[Stamp]:
+    """Returns the modification time and size of a file, ``None`` if it is missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def stamp_directory(path: os.PathLike) -> dict[str, Stamp]:
+    """Returns the stamp of every file in a directory tree."""
+    stamps = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            file_stamp = stamp(file_path)
+            if file_stamp is not None:
+                stamps[file_path] = file_stamp
+    return stamps
+
+
+@dataclass
+class Watcher:
+    """Regenerates the calendar of a configuration file when its inputs change.
+
+    ``interval`` is the polling period and ``debounce`` the quiet time, in seconds,
+    waited for after a change so that a burst of saves triggers a single build.
+    The calendar is written atomically to ``output_path``, its months rendered by
+    ``jobs`` processes. The configuration is cached in ``cache_dir``, if any.
+    ``config`` is the configuration already read from ``config_path``, if any.
+    """
+
+    config_path: pathlib.Path
+    output_path: pathlib.Path
+    html_config: HTMLConfiguration = field(default_factory=HTMLConfiguration)
+    fragment_cache: Optional[FragmentCache] = None
+    interval: float = 0.1
+    debounce: float = 0.2
+    log: Callable[[str], None] = field(default=print, repr=False)
+    jobs: int = 1
+    cache_dir: Optional[os.PathLike] = None
+    config: Optional[UserConfiguration] = None
+    builds: int = field(init=False, default=0)
+    _stamps: dict[str, object] = field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        if self.config is not None:
+            self._stamps = self.stamps()
+
+    def sources(self) -> dict[str, os.PathLike]:
+        """Returns the file or directory read by each stage."""
+        sources: dict[str, os.PathLike] = {CONFIG: self.config_path}
+        if self.config is not None:
+            if self.config.comments_path is not None:
+                sources[COMMENTS] = self.config.comments_path
+            sources[TEMPLATES] = pathlib.Path(self.config.template_search_path)
+        return sources
+
+    def stamps(self) -> dict[str, object]:
+        """Returns the stamps of the files of each stage."""
+        stamps: dict[str, object] = {}
+        for stage, path in self.sources().items():
+            stamps[stage] = stamp_directory(path) if stage == TEMPLATES else stamp(path)
+        return stamps
+
+    def changes(self) -> set[str]:
+        """Returns the stages whose files changed since the previous call."""
+        stamps = self.stamps()
+        changed = {
+            stage
+            for stage in stamps.keys() | self._stamps.keys()
+            if stamps.get(stage) != self._stamps.get(stage)
+        }
+        self._stamps = stamps
+        return changed
+
+    def wait_for_changes(self, pending: Optional[set[str]] = None) -> set[str]:
+        """Blocks until files changed and stayed unchanged for ``debounce`` seconds.
+
+        ``pending`` are stages that already changed, e.g. during the previous build.
+        Returns the stages that changed.
+        """
+        changed = set(pending or ())
+        last_change = time.monotonic() if changed else None
+        while True:
+            new_changes = self.changes()
+            now = time.monotonic()
+            if new_changes:
+                changed |= new_changes
+                last_change = now
+            elif last_change is not None and now - last_change >= self.debounce:
+                return changed
+            time.sleep(self.interval)
+
+    def update(self, changed: set[str]):
+        """Runs the stages depending on the ``changed`` files again."""
+        if self.config is None or CONFIG in changed:
+            self.config = read_configuration_file(self.config_path, self.cache_dir)
+        elif COMMENTS in changed:
+            self.config = dataclasses.replace(
+                self.config,
+                comments_html=read_comments_markdown(self.config.comments_path),
+            )
+        # Outdated templates are compiled again by the Jinja environment.
+
+    def build(self, changed: set[str]):
+        """Updates the stages depending on the ``changed`` files and writes the calendar."""
+        start = time.perf_counter()
+        self.update(changed)
+        cal = create_calendar(self.config, self.html_config, self.fragment_cache)
+        write_html(self.output_path, cal.generate(self.jobs))
+        self.builds += 1
+        elapsed = (time.perf_counter() - start) * 1000
+        self.log(f"Wrote calendar to {self.output_path} in {elapsed:.0f} ms")
+
+    def run(self, max_builds: Optional[int] = None):
+        """Builds the calendar, then again each time its inputs change.
+
+        Errors, e.g. a configuration file saved while being edited, are reported and
+        the watcher waits for the next change. Returns after ``max_builds`` builds if
+        it is not ``None``, runs until interrupted otherwise.
+        """
+        changed = self.changes()
+        while max_builds is None or self.builds < max_builds:
+            sources = self.sources()
+            try:
+                self.build(changed)
+            except Exception as exc:  # pylint: disable=broad-except  # keep watching
+                self.log(f"{self.config_path}: {type(exc).__name__}: {exc}")
+            # Files saved during the build are built again, files only referenced
+            # by the new configuration, e.g. another comments file, are stamped.
+            new_sources = self.sources()
+            pending = {
+                stage
+                for stage in self.changes()
+                if stage in sources and new_sources.get(stage) == sources[stage]
+            }
+            if max_builds is not None and self.builds >= max_builds:
+                break
+            changed = self.wait_for_changes(pending)
@@ -1,6 +1,8 @@
 import argparse
+import json
 import pathlib
 import sys
+from typing import Optional
 
 import kaloot
 
@@ -8,28 +10,170 @@ import kaloot
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments"""
     parser = argparse.ArgumentParser()
-    parser.add_argument("config", help="The configuration file", type=pathlib.Path)
+    parser.add_argument(
+        "config", help="The configuration file(s)", type=pathlib.Path, nargs="+"
+    )
     parser.add_argument(
         "-o",
         "--output",
-        help="The output HTML calendar file",
+        help="The output HTML calendar file, or the output directory with --batch",
         type=pathlib.Path,
     )
+    parser.add_argument(
+        "--batch",
+        help="Generate the calendar of every configuration file in one process",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help=kaloot.html.OUTPUT_FORMAT_HELP,
+        choices=kaloot.html.OUTPUT_FORMATS,
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="The number of processes rendering months, or calendars with --batch"
+        " (default: 1)",
+        type=int,
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=kaloot.cache.CACHE_DIR_HELP,
+        type=pathlib.Path,
+    )
+    parser.add_argument(
+        "--watch",
+        help="Regenerate the calendar each time the configuration file, the comments"
+        " or the templates change",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--stats",
+        help="Print the days spent with each guardian instead of generating the"
+        " calendar",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--stats-format",
+        help="The format of the statistics (default: table)",
+        choices=["table", "json"],
+    )
     args = parser.parse_args()
-    kaloot.io.check_file_exists(args.config)
+    if args.stats_format is not None and not args.stats:
+        parser.error("--stats-format requires --stats")
+    if args.stats_format is None:
+        args.stats_format = "table"
+    if args.stats:
+        # Only the configuration cache is used when printing statistics.
+        for option, value in [
+            ("-o/--output", args.output),
+            ("--batch", args.batch),
+            ("-f/--format", args.format),
+            ("-j/--jobs", args.jobs),
+            ("--watch", args.watch),
+        ]:
+            if value is not None and value is not False:
+                parser.error(f"--stats and {option} are mutually exclusive")
+        return args
+    if args.format is None:
+        args.format = "pretty"
+    if args.jobs is None:
+        args.jobs = 1
+    if len(args.config) > 1 and not args.batch:
+        parser.error("several configuration files require --batch, or --stats")
+    if args.watch and args.batch:
+        parser.error("--watch and --batch are mutually exclusive")
+    if not args.batch:
+        args.config = args.config[0]
+        kaloot.io.check_file_exists(args.config)
     return args
 
 
+def main_batch(args: argparse.Namespace) -> int:
+    """Generates the calendars of several configuration files."""
+    html_config = kaloot.html.HTMLConfiguration(output_format=args.format)
+    try:
+        report = kaloot.batch.run_batch(
+            args.config,
+            args.output or pathlib.Path("."),
+            html_config,
+            args.jobs,
+            args.cache_dir,
+        )
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    for result in report.results:
+        if result.ok:
+            print(f"{result.config_path}: wrote {result.output_path}")
+        else:
+            print(f"{result.config_path}: FAILED: {result.error}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+def main_stats(args: argparse.Namespace):
+    """Prints the custody statistics of several configuration files."""
+    reports = {
+        path: kaloot.stats.compute_config_stats(
+            kaloot.io.read_configuration_file(path, args.cache_dir)
+        )
+        for path in args.config
+    }
+    if args.stats_format == "json":
+        data = {str(path): report.to_dict() for path, report in reports.items()}
+        print(json.dumps(data, indent=2, ensure_ascii=False))
+        return
+    for position, (path, report) in enumerate(reports.items()):
+        if position:
+            print()
+        print(f"{path}:")
+        print(report.format_table())
+
+
+def main_watch(
+    args: argparse.Namespace,
+    config: kaloot.config.UserConfiguration,
+    html_config: kaloot.html.HTMLConfiguration,
+    fragment_cache: Optional[kaloot.cache.FragmentCache],
+):
+    """Regenerates the calendar until interrupted."""
+    watcher = kaloot.watch.Watcher(
+        args.config,
+        args.output or pathlib.Path(f"calendar-{config.year}.html"),
+        html_config,
+        fragment_cache,
+        jobs=args.jobs,
+        cache_dir=args.cache_dir,
+        config=config,
+    )
+    print(f"Watching {args.config}, press Ctrl+C to stop")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
 def main():
     """Main function"""
     args = parse_args()
-    config = kaloot.io.read_configuration_file(args.config)
+    if args.stats:
+        return main_stats(args)
+    if args.batch:
+        return main_batch(args)
+    config = kaloot.io.read_configuration_file(args.config, args.cache_dir)
 
-    cal = kaloot.html.create_calendar(config)
-    html = cal.render()
+    html_config = kaloot.html.HTMLConfiguration(output_format=args.format)
+    fragment_cache = (
+        kaloot.cache.FragmentCache(args.cache_dir) if args.cache_dir else None
+    )
+    if args.watch:
+        return main_watch(args, config, html_config, fragment_cache)
+    cal = kaloot.html.create_calendar(config, html_config, fragment_cache)
 
     output_path = args.output or pathlib.Path(f"calendar-{config.year}.html")
-    kaloot.io.write_html(output_path, html)
+    kaloot.io.write_html(output_path, cal.generate(args.jobs))
     print("Wrote calendar to", output_path)
 
 
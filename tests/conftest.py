@@ -0,0 +1,74 @@
+from kaloot.config import UserConfiguration
+from kaloot.date import date_collection, date_range
+from kaloot.event import Event
+
+import pathlib
+from typing import Callable, Optional
+
+import pytest
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent
+
+CONFIG = """
+template_dir: {template_dir}
+year: {year}
+Vacances scolaires:
+  css_class: "vacancesscolaires"
+  dates:
+    - 20/12/{previous_year} - 04/01/{year}
+    - 04/07 - 31/08
+"""
+
+
+@pytest.fixture
+def template_dir() -> pathlib.Path:
+    """Returns the directory of the templates shipped with the calendar."""
+    return ROOT_DIR / "templates"
+
+
+@pytest.fixture
+def write_config(
+    tmp_path: pathlib.Path, template_dir: pathlib.Path
+) -> Callable[..., pathlib.Path]:
+    """Returns a function writing a configuration file to ``tmp_path / name``.
+
+    The configuration has the Christmas and summer holidays of ``year``, ``extra``
+    is appended to it, e.g. custody overrides.
+    """
+
+    def write(
+        name: str = "config.yaml",
+        year: int = 2026,
+        comments: Optional[pathlib.Path] = None,
+        templates: Optional[pathlib.Path] = None,
+        extra: str = "",
+    ) -> pathlib.Path:
+        text = CONFIG.format(
+            template_dir=templates or template_dir, year=year, previous_year=year - 1
+        )
+        if comments is not None:
+            text = f"\ncomments: {comments}{text}"
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text + extra, encoding="utf-8")
+        return path
+
+    return write
+
+
+@pytest.fixture
+def make_config(template_dir: pathlib.Path) -> Callable[..., UserConfiguration]:
+    """Returns a function creating a 2026 configuration with the given holidays."""
+
+    def make(ranges: list[str]) -> UserConfiguration:
+        holidays = date_collection()
+        for range_ in ranges:
+            holidays.add_range(date_range.from_string(range_, 2026))
+        return UserConfiguration(
+            year=2026,
+            template_search_path=str(template_dir),
+            comments_html="<p>comments</p>",
+            school_holidays=Event("Vacances scolaires", "vacancesscolaires", holidays),
+        )
+
+    return make
@@ -0,0 +1,43 @@
+from kaloot.batch import run_batch
+from kaloot.html import create_calendar
+from kaloot.io import read_configuration_file
+
+import pathlib
+from typing import Callable
+
+import pytest
+
+
+@pytest.fixture
+def config_paths(
+    tmp_path: pathlib.Path, write_config: Callable[..., pathlib.Path]
+) -> list[pathlib.Path]:
+    paths = [write_config(f"family-{year}.yaml", year) for year in [2025, 2026, 2027]]
+    broken = tmp_path / "broken.yaml"
+    broken.write_text("year: 2026\n", encoding="utf-8")
+    return paths + [broken]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_batch(config_paths: list[pathlib.Path], tmp_path: pathlib.Path, jobs: int):
+    report = run_batch(config_paths, tmp_path / "out", jobs=jobs)
+    assert [result.config_path for result in report.results] == config_paths
+    assert len(report.succeeded) == 3
+    assert [result.config_path.name for result in report.failed] == ["broken.yaml"]
+    assert "Vacances scolaires" in report.failed[0].error
+    assert report.throughput() > 0
+    for result in report.succeeded:
+        expected = create_calendar(read_configuration_file(result.config_path)).render()
+        assert (
+            result.output_path == tmp_path / "out" / f"{result.config_path.stem}.html"
+        )
+        assert result.output_path.read_text(encoding="utf-8") == expected
+
+
+def test_run_batch_same_stem(
+    tmp_path: pathlib.Path, write_config: Callable[..., pathlib.Path]
+):
+    paths = [write_config(f"families/{family}/config.yaml") for family in "ab"]
+    with pytest.raises(ValueError, match="config.yaml"):
+        run_batch(paths, tmp_path / "out")
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,70 @@
+from kaloot.cache import FragmentCache
+from kaloot.config import UserConfiguration
+from kaloot.html import create_calendar
+
+import os
+import pathlib
+import time
+from typing import Callable
+
+
+def test_fragment_cache(
+    tmp_path: pathlib.Path, make_config: Callable[..., UserConfiguration]
+):
+    ranges = ["20/12/2025 - 04/01/2026", "21/02 - 08/03", "04/07 - 31/08"]
+    config = make_config(ranges)
+    expected = create_calendar(config).render()
+
+    fragment_cache = FragmentCache(tmp_path / "cache")
+    assert create_calendar(config, fragment_cache=fragment_cache).render() == expected
+    assert (fragment_cache.hits, fragment_cache.misses) == (0, 13)
+
+    # A new process reads every fragment from disk, without evaluating the cells.
+    fragment_cache = FragmentCache(tmp_path / "cache")
+    cal = create_calendar(config, fragment_cache=fragment_cache)
+    assert cal.render() == expected
+    assert (fragment_cache.hits, fragment_cache.misses) == (13, 0)
+    assert cal._feature_matrix is None
+
+    # Moving the February holidays only renders the months whose cells changed.
+    ranges[1] = "14/02 - 01/03"
+    config = make_config(ranges)
+    fragment_cache.hits = 0
+    html = create_calendar(config, fragment_cache=fragment_cache).render()
+    assert html == create_calendar(config).render()
+    assert (fragment_cache.hits, fragment_cache.misses) == (11, 2)
+
+    fragment_cache.clear()
+    assert not list(fragment_cache.directory.glob("*/*.html"))
+    create_calendar(config, fragment_cache=fragment_cache).render()
+    assert fragment_cache.misses == 2 + 13
+
+
+def test_fragment_cache_prune(tmp_path: pathlib.Path):
+    fragment_cache = FragmentCache(tmp_path)
+    for key in ["aa1", "aa2", "bb1", "bb2"]:
+        fragment_cache.put(key, key * 300)
+    now = time.time()
+    for age, key in enumerate(["bb2", "bb1", "aa2", "aa1"]):
+        os.utime(fragment_cache.path(key), (now - age * 100, now - age * 100))
+
+    fragment_cache.max_age = 250
+    fragment_cache.prune()
+    assert not fragment_cache.path("aa1").exists()
+    assert fragment_cache.get("aa1") is None
+
+    fragment_cache.max_bytes = 2000
+    fragment_cache.prune()
+    assert sorted(path.stem for path in tmp_path.glob("*/*.html")) == ["bb1", "bb2"]
+
+    # Reading a fragment marks it as recently used.
+    assert FragmentCache(tmp_path).get("bb1") == "bb1" * 300
+    fragment_cache.max_bytes = 1000
+    fragment_cache.prune()
+    assert [path.stem for path in tmp_path.glob("*/*.html")] == ["bb1"]
+
+    # The cache is pruned on the first write.
+    os.utime(fragment_cache.path("bb1"), (now - 100, now - 100))
+    fragment_cache = FragmentCache(tmp_path, max_bytes=0)
+    fragment_cache.put("cc1", "")
+    assert [path.stem for path in tmp_path.glob("*/*.html")] == ["cc1"]
@@ -1,4 +1,4 @@
-from kaloot.calendar import Calendar
+from kaloot.calendar import Calendar, YearTable
 
 from calendar import monthrange, monthcalendar
 import datetime
@@ -44,5 +44,20 @@ def test_iter_month_weeks(cal: Calendar, month_id: int):
             assert date.month == month_id
 
 
+@given(integers(min_value=datetime.MINYEAR, max_value=datetime.MAXYEAR))
+def test_year_table(year: int):
+    table = YearTable.of(year)
+    assert table is YearTable.of(year)
+    assert len(table) == sum(number_of_days_in_month(year, m) for m in range(1, 13))
+    for index in (0, len(table) // 2, len(table) - 1):
+        day = table.date(index)
+        assert table.index(day) == index
+        assert table.weekday[index] == day.weekday()
+        assert table.week[index] == day.weekid()
+        assert table.parity[index] == (0 if day.is_even_week() else 1)
+        assert table.is_even_week(index) == day.is_even_week()
+        assert table.is_weekend(index) == day.is_weekend()
+
+
 if __name__ == "__main__":
     test_iter_month_dates()
@@ -0,0 +1,220 @@
+from kaloot.custody import (
+    CustodyIndex,
+    CustodyPeriod,
+    Handover,
+    get_guardian,
+    get_special_days,
+    guardian_transition,
+    iter_periods,
+    solve_year,
+    update_year,
+)
+from kaloot.date import date, date_collection, date_range
+from kaloot.rules import CustodyRules
+
+import datetime
+from typing import Callable
+
+from hypothesis import given, settings
+import pytest
+from hypothesis.strategies import composite, integers, lists, SearchStrategy
+
+
+@composite
+def school_holidays(
+    draw: Callable[SearchStrategy[int], int],
+) -> tuple[int, date_collection]:
+    year = draw(integers(min_value=2021, max_value=2040))
+    lengths = draw(lists(integers(min_value=1, max_value=60), min_size=1, max_size=8))
+    gaps = draw(lists(integers(min_value=2, max_value=60), min_size=8, max_size=8))
+    holidays = date_collection()
+    start = date(year - 1, 12, 20)
+    for length, gap in zip(lengths, gaps):
+        end = start + length
+        holidays.add_range(date_range(start, end))
+        start = end + gap
+    return year, holidays
+
+
+@settings(max_examples=20, deadline=None)
+@given(school_holidays())
+def test_solve_year(year_holidays: tuple[int, date_collection]):
+    year, holidays = year_holidays
+    timeline = solve_year(year, holidays)
+    assert len(timeline) == (date(year, 12, 31) - date(year, 1, 1)).days + 1
+    for day in date_range(date(year, 1, 1), date(year, 12, 31)):
+        assert timeline[day] == get_guardian(day, holidays)
+
+
+def test_solve_year_known_days():
+    holidays = date_collection()
+    holidays.add_range(date_range.from_string("20/12/2025 - 04/01/2026", 2026))
+    holidays.add_range(date_range.from_string("04/07 - 31/08", 2026))
+    timeline = solve_year(2026, holidays)
+    assert timeline[date(2026, 6, 21)] == "B"  # Father's day
+    assert timeline[date(2026, 5, 31)] == "L"  # Mother's day
+    assert timeline[date(2026, 8, 1)] == "L→B"
+    assert date(2027, 1, 1) not in timeline
+    assert datetime.date(2026, 1, 1) not in timeline
+
+
+# School holidays of the published configurations, with the guardian on the last
+# day of each holiday period, as computed before the whole-year solver.
+PUBLISHED_HOLIDAYS = {
+    2023: [
+        ("17/12/2022 - 02/01/2023", "B"),
+        ("18/02 - 05/03", "L"),
+        ("22/04 - 08/05", "L→B"),
+        ("08/07 - 03/09", "L"),
+        ("21/10 - 05/11", "L→B"),
+        ("23/12 - 07/01/2024", "L"),
+    ],
+    2024: [
+        ("23/12/2023 - 07/01/2024", "L"),
+        ("10/02 - 25/02", "B"),
+        ("06/04 - 21/04", "B"),
+        ("06/07 - 01/09", "B→L"),
+        ("19/10 - 03/11", "B"),
+        ("21/12 - 05/01/2025", "B→L"),
+    ],
+    2025: [
+        ("21/12/2024 - 05/01/2025", "B→L"),
+        ("15/02 - 02/03", "L"),
+        ("12/04 - 27/04", "L"),
+        ("05/07 - 31/08", "L"),
+        ("18/10 - 02/11", "L→B"),
+        ("20/12 - 04/01/2026", "L"),
+    ],
+    2026: [
+        ("20/12/2025 - 04/01/2026", "L"),
+        ("21/02 - 08/03", "B"),
+        ("18/04 - 03/05", "B"),
+        ("04/07 - 31/08", "B→L"),
+        ("17/10 - 01/11", "B"),
+        ("19/12 - 03/01/2027", "B"),
+    ],
+    2027: [
+        ("19/12/2026 - 03/01/2027", "B"),
+        ("06/02 - 21/02", "L"),
+        ("03/04 - 18/04", "L"),
+        ("03/07 - 31/08", "L→B"),
+    ],
+}
+
+
+@pytest.mark.parametrize("year", sorted(PUBLISHED_HOLIDAYS))
+def test_last_holiday_day(year: int):
+    holidays = date_collection()
+    for range_, _ in PUBLISHED_HOLIDAYS[year]:
+        holidays.add_range(date_range.from_string(range_, year))
+    for range_, guardian in PUBLISHED_HOLIDAYS[year]:
+        last = date_range.from_string(range_, year).end
+        assert get_guardian(last, holidays) == guardian
+        assert solve_year(last.year, holidays)[last] == guardian
+
+
+def test_nested_holidays():
+    holidays = date_collection()
+    holidays.add_range(date_range.from_string("04/07 - 31/08", 2026))
+    holidays.add_range(date_range.from_string("20/07 - 21/07", 2026))
+    holidays.add_date(date(2026, 7, 14))
+
+    # Days in a nested range or date stay in the summer holidays declared first.
+    expected = ["L"] * 28 + ["L→B"] + ["B"] * 29 + ["B→L"]
+    summer = date_range.from_string("04/07 - 31/08", 2026)
+    timeline = solve_year(2026, holidays)
+    rules_timeline = CustodyRules().compile().solve_year(2026, holidays)
+    assert [get_guardian(day, holidays) for day in summer] == expected
+    assert [timeline[day] for day in summer] == expected
+    assert [rules_timeline[day] for day in summer] == expected
+
+
+def test_overrides():
+    holidays = date_collection()
+    holidays.add_range(date_range.from_string("19/12/2026 - 03/01/2027", 2027))
+    overrides = {date(2027, 12, 25): "B", date(2027, 5, 30): "B"}
+    timeline = solve_year(2027, holidays, overrides)
+    assert get_special_days(2027) == {date(2027, 6, 20): "B", date(2027, 5, 30): "L"}
+    assert timeline[date(2027, 12, 25)] == "B"
+    assert timeline[date(2027, 5, 30)] == "B"
+    assert timeline[date(2027, 6, 20)] == "B"
+    for day in date_range(date(2027, 1, 1), date(2027, 12, 31)):
+        assert timeline[day] == get_guardian(day, holidays, overrides)
+
+
+@settings(max_examples=20, deadline=None)
+@given(school_holidays())
+def test_iter_periods(year_holidays: tuple[int, date_collection]):
+    year, holidays = year_holidays
+    start, end = date(year - 1, 11, 15), date(year, 12, 31)
+    days = []
+    previous = None
+    for item in iter_periods(start, end, holidays):
+        if isinstance(item, Handover):
+            days.append((item.day, guardian_transition(item.giver, item.receiver)))
+        else:
+            assert isinstance(item, CustodyPeriod)
+            if isinstance(previous, CustodyPeriod):
+                assert previous.guardian != item.guardian
+            days.extend(
+                (day, item.guardian) for day in date_range(item.first, item.last)
+            )
+            assert len(item) == item.last.toordinal() - item.first.toordinal() + 1
+        previous = item
+    assert days == [
+        (day, get_guardian(day, holidays)) for day in date_range(start, end)
+    ]
+
+
+@settings(max_examples=10, deadline=None)
+@given(school_holidays())
+def test_custody_index(year_holidays: tuple[int, date_collection]):
+    year, holidays = year_holidays
+    overrides = {date(year, 12, 25): "B"}
+    first, last = date(year - 1, 12, 1), date(year, 12, 31)
+    index = CustodyIndex.build(first, last, holidays, overrides)
+    for day in date_range(first, last):
+        assert index.guardian_at(day) == get_guardian(day, holidays, overrides)
+    with pytest.raises(KeyError):
+        index.guardian_at(last + 1)
+
+    periods = index.guardian_between(date(year, 2, 10), date(year, 11, 20))
+    assert periods[0].first == date(year, 2, 10)
+    assert periods[-1].last == date(year, 11, 20)
+    for period in periods:
+        for day in date_range(period.first, period.last):
+            assert index.guardian_at(day) == period.guardian
+    assert index.guardian_between(last, first) == []
+
+    assert CustodyIndex.loads(index.dumps()) == index
+
+
+@settings(max_examples=30, deadline=None)
+@given(
+    school_holidays(),
+    integers(min_value=0, max_value=7),
+    integers(min_value=-10, max_value=10),
+    integers(min_value=-10, max_value=10),
+)
+def test_update_year(
+    year_holidays: tuple[int, date_collection], position: int, shift: int, resize: int
+):
+    year, old_holidays = year_holidays
+    overrides = {date(year, 12, 24): "L"}
+    new_holidays = date_collection()
+    for index, range_ in enumerate(old_holidays.ranges):
+        if index == position % len(old_holidays.ranges):
+            start = range_.start + shift
+            range_ = date_range(start, max(start, range_.end + shift + resize))
+        new_holidays.add_range(range_)
+
+    timeline = solve_year(year, old_holidays, overrides)
+    update = update_year(timeline, old_holidays, new_holidays, overrides)
+    expected = solve_year(year, new_holidays, overrides)
+    assert update.timeline == expected
+    assert update.changed == [
+        day
+        for day in date_range(date(year, 1, 1), date(year, 12, 31))
+        if timeline[day] != expected[day]
+    ]
+    assert update.recomputed <= len(timeline)
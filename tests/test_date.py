@@ -0,0 +1,223 @@
+import kaloot.date
+from kaloot.date import (
+    date,
+    date_bitset,
+    date_collection,
+    date_range,
+    paques,
+    public_holidays,
+    public_holidays_range,
+)
+
+import dataclasses
+import pickle
+from typing import Callable
+
+from hypothesis import given
+from hypothesis.strategies import composite, integers, lists, tuples, SearchStrategy
+import pytest
+
+FIRST_ORDINAL = date(2024, 1, 1).toordinal()
+
+
+@composite
+def collection(
+    draw: Callable[SearchStrategy[int], int],
+) -> tuple[date_collection, set[int]]:
+    offsets = integers(min_value=0, max_value=120)
+    ranges = draw(lists(tuples(offsets, integers(min_value=0, max_value=20))))
+    dates = draw(lists(offsets))
+    col = date_collection()
+    ordinals = set()
+    for start, length in ranges:
+        start += FIRST_ORDINAL
+        col.add_range(
+            date_range(date.fromordinal(start), date.fromordinal(start + length))
+        )
+        ordinals.update(range(start, start + length + 1))
+    for offset in dates:
+        col.add_date(date.fromordinal(FIRST_ORDINAL + offset))
+        ordinals.add(FIRST_ORDINAL + offset)
+    return col, ordinals
+
+
+@given(collection())
+def test_collection_index(col_ordinals: tuple[date_collection, set[int]]):
+    col, ordinals = col_ordinals
+    expected = [date.fromordinal(ordinal) for ordinal in sorted(ordinals)]
+    assert len(col) == len(expected)
+    assert col.aslist() == expected
+    assert [col[i] for i in range(len(col))] == expected
+    if expected:
+        assert col[0] == expected[0]
+        assert col[-1] == expected[-1]
+    for offset in range(-1, 150):
+        day = date.fromordinal(FIRST_ORDINAL + offset)
+        assert (day in col) == (day.toordinal() in ordinals)
+
+
+@given(collection())
+def test_collection_direct_mutation(col_ordinals: tuple[date_collection, set[int]]):
+    col, ordinals = col_ordinals
+    day = date.fromordinal(FIRST_ORDINAL + 200)
+    col.date_list.append(day)
+    assert day in col
+    assert len(col) == len(ordinals) + 1
+
+
+def test_collection_replace_in_place():
+    col = date_collection(
+        [date(2026, 3, 1)], [date_range.from_string("01/01/2026 - 05/01/2026")]
+    )
+    assert date(2026, 1, 3) in col
+    col.ranges[0] = date_range.from_string("01/02/2026 - 05/02/2026")
+    assert date(2026, 1, 3) not in col
+    assert date(2026, 2, 3) in col
+    col.date_list[0] = date(2026, 4, 1)
+    assert date(2026, 3, 1) not in col
+    assert col[-1] == date(2026, 4, 1)
+    col.ranges = [date_range.from_string("01/01/2026 - 02/01/2026")]
+    assert len(col) == 3
+
+    # Ranges are immutable, edited ranges replace the previous ones.
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        col.ranges[0].end = date(2026, 1, 10)
+    col.ranges[0] = col.ranges[0].replace(end=date(2026, 1, 10))
+    assert len(col) == 11
+    assert date(2026, 1, 9) in col
+
+    frozen = date_collection(list(col.date_list), list(col.ranges)).freeze()
+    assert frozen == col
+    assert len(frozen) == 11
+
+
+def test_collection_keeps_descriptions():
+    christmas = date(2024, 12, 25, description="noël")
+    col = date_collection(
+        [christmas], [date_range(date(2024, 12, 21), date(2025, 1, 5))]
+    )
+    assert len(col) == 16
+    assert col[4].description == "noël"
+    assert col.ranges == [date_range(date(2024, 12, 21), date(2025, 1, 5))]
+
+
+def as_ordinals(bitset: date_bitset) -> set[int]:
+    return {day.toordinal() for day in bitset}
+
+
+@given(collection(), collection())
+def test_bitset_algebra(
+    first: tuple[date_collection, set[int]], second: tuple[date_collection, set[int]]
+):
+    (col_a, ordinals_a), (col_b, ordinals_b) = first, second
+    bits_a, bits_b = col_a.asbitset(), col_b.asbitset()
+    assert as_ordinals(bits_a) == ordinals_a
+    assert as_ordinals(bits_a | bits_b) == ordinals_a | ordinals_b
+    assert as_ordinals(bits_a & bits_b) == ordinals_a & ordinals_b
+    assert as_ordinals(bits_a - bits_b) == ordinals_a - ordinals_b
+    assert as_ordinals(bits_a ^ bits_b) == ordinals_a ^ ordinals_b
+    universe = date_range(date.fromordinal(FIRST_ORDINAL), date(2024, 12, 31))
+    expected = set(range(FIRST_ORDINAL, date(2024, 12, 31).toordinal() + 1))
+    assert as_ordinals(bits_a.complement(universe)) == expected - ordinals_a
+    assert bits_a.count() == len(ordinals_a)
+    if ordinals_a:
+        assert bits_a.first().toordinal() == min(ordinals_a)
+        assert bits_a.last().toordinal() == max(ordinals_a)
+    assert bits_a.ascollection().aslist() == col_a.aslist()
+    assert bits_a.ascollection().asbitset() == bits_a
+
+
+def test_bitset_adjacent_ranges():
+    ranges = [
+        date_range.from_string("20/12/2025 - 31/12/2025"),
+        date_range.from_string("01/01/2026 - 04/01/2026"),
+        date_range.from_string("05/01/2026 - 05/01/2026"),
+        date_range.from_string("10/01/2026 - 12/01/2026"),
+    ]
+    bitset = date_collection(ranges=ranges).asbitset()
+    assert list(bitset.intervals()) == [
+        (ranges[0].start.toordinal(), ranges[2].end.toordinal()),
+        (ranges[3].start.toordinal(), ranges[3].end.toordinal()),
+    ]
+    assert bitset.ascollection().ranges == ranges
+    assert bitset == date_bitset.from_intervals(bitset.intervals())
+    january = date_range(date(2026, 1, 1), date(2026, 1, 31)).asbitset()
+    assert (bitset & january).ascollection().ranges == ranges[1:]
+
+
+def test_bitset_weekdays():
+    year = date_range(date(2026, 1, 1), date(2026, 12, 31))
+    weekends = date_bitset.from_weekdays(year, [5, 6])
+    assert len(weekends) == 104
+    assert all(day.is_weekend() for day in weekends)
+    assert weekends.first() == date(2026, 1, 3)
+
+
+@given(integers(min_value=1583, max_value=9999))
+def test_paques(year: int):
+    day = paques(year)
+    assert day.is_sunday()
+    assert date(year, 3, 22) <= day <= date(year, 4, 25)
+
+
+def test_paques_known_years():
+    assert paques(2021) == date(2021, 4, 4)
+    assert paques(2024) == date(2024, 3, 31)
+    assert paques(2038) == date(2038, 4, 25)
+    assert paques(2285) == date(2285, 3, 22)
+
+
+def test_public_holidays_shared():
+    holidays = public_holidays_range(2025, 2027)
+    assert list(holidays) == [2025, 2026, 2027]
+    assert holidays[2026] is public_holidays(2026)
+    assert len(holidays[2026]) == 13
+    assert holidays[2026].is_frozen()
+    with pytest.raises(TypeError):
+        holidays[2026].add_date(date(2026, 1, 2))
+    assert paques(2026).description == ""
+    descriptions = {day: day.description for day in holidays[2026]}
+    assert descriptions[paques(2026)] == "pâques"
+
+
+def test_date_interned():
+    day = date(2026, 3, 14)
+    assert date(2026, 3, 14) is day
+    assert date.fromordinal(day.toordinal()) is day
+    assert date(2026, 3, 13) + 1 is day
+    assert date_range(date(2026, 3, 1), date(2026, 3, 31))[13] is day
+    assert pickle.loads(pickle.dumps(day)) is day
+    assert not hasattr(day, "__dict__")
+
+
+def test_date_interned_bounded(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(kaloot.date, "_INTERNED", {})
+    monkeypatch.setattr(kaloot.date, "_INTERNED_SIZE", 10)
+    for day in date_range(date(2026, 1, 1), date(2026, 12, 31)):
+        assert date.fromordinal(day.toordinal()) == day
+    assert len(kaloot.date._INTERNED) <= 10
+
+
+def test_date_description():
+    day = date(2026, 3, 15, description="anniversaire")
+    assert day == date(2026, 3, 15)
+    assert day.description == "anniversaire"
+    assert date(2026, 3, 15).description == ""
+    assert date(2026, 3, 15, description="").description == ""
+    assert day.description == "anniversaire"
+    with pytest.raises(AttributeError):
+        date(2026, 3, 15).description = "anniversaire"
+    day.description = ""
+    assert day.description == ""
+
+
+def test_date_pickle():
+    day = date(2026, 3, 15, description="anniversaire")
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        loaded = pickle.loads(pickle.dumps(day, protocol))
+        assert loaded == day
+        assert loaded.description == "anniversaire"
+        assert pickle.loads(pickle.dumps(date(2026, 3, 15), protocol)) is date(
+            2026, 3, 15
+        )
+    assert date(2026, 3, 15).description == ""
@@ -0,0 +1,35 @@
+from kaloot.date import date, date_collection, date_range
+from kaloot.event import Event
+from kaloot.feature import merge
+
+from typing import Callable
+
+from hypothesis import given, settings
+from hypothesis.strategies import composite, integers, lists, tuples, SearchStrategy
+
+
+@composite
+def events(draw: Callable[SearchStrategy[int], int]) -> list[Event]:
+    offsets = integers(min_value=-30, max_value=395)
+    event_list = []
+    for position in range(draw(integers(min_value=1, max_value=70))):
+        dates = date_collection()
+        for start, length in draw(lists(tuples(offsets, integers(0, 30)), max_size=4)):
+            first = date(2026, 1, 1) + start
+            dates.add_range(date_range(first, first + length))
+        event_list.append(Event(f"event {position}", f"css{position}", dates))
+    return event_list
+
+
+@settings(max_examples=20, deadline=None)
+@given(events())
+def test_merge_bitmasks(event_list: list[Event]):
+    feature = merge(event_list)
+    days = list(date_range(date(2026, 1, 1), date(2026, 12, 31)))
+    attrs, _ = feature.format_column(days)
+    for day, day_attrs in zip(days, attrs):
+        expected = feature.css_class + [
+            event.css_class for event in event_list if day in event.dates
+        ]
+        assert feature.dynamic_css_class(day) == expected
+        assert day_attrs == f'class="{" ".join(expected)}"'
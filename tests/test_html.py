@@ -0,0 +1,96 @@
+from kaloot.config import UserConfiguration
+from kaloot.date import date, date_range
+from kaloot.html import (
+    HTMLConfiguration,
+    MasterCalendar,
+    create_calendar,
+    get_jinja_env,
+    init_jinja_env,
+    minify,
+    prettify,
+)
+from kaloot.io import write_html
+
+import concurrent.futures
+import pathlib
+import pickle
+from typing import Callable
+
+import pytest
+
+
+@pytest.fixture
+def calendar(make_config: Callable[..., UserConfiguration]) -> MasterCalendar:
+    ranges = ["20/12/2025 - 04/01/2026", "21/02 - 08/03", "04/07 - 31/08"]
+    return create_calendar(make_config(ranges))
+
+
+def test_generate(calendar: MasterCalendar, tmp_path: pathlib.Path):
+    html = calendar.render()
+    chunks = list(calendar.generate())
+    assert len(chunks) > 12
+    assert "".join(chunks) == html
+    write_html(tmp_path / "calendar.html", calendar.generate())
+    assert (tmp_path / "calendar.html").read_text(encoding="utf-8") == html
+
+
+def test_output_formats(calendar: MasterCalendar):
+    assert calendar.config.output_format == "pretty"
+    pretty = calendar.render()
+    calendar.config.output_format = "raw"
+    raw = calendar.render()
+    assert "\n    " in raw
+    assert pretty != raw
+    assert prettify(calendar.format_month(2)) in pretty
+    calendar.config.output_format = "minified"
+    minified = calendar.render()
+    assert len(minified) < len(raw)
+    assert '<table class="month"><thead>' in minified
+    with pytest.raises(ValueError):
+        HTMLConfiguration(output_format="compact")
+
+    # ``output_format`` comes last, the other fields keep their positions.
+    css_class = {"legend": "legende"}
+    assert HTMLConfiguration(css_class).css_class is css_class
+    assert HTMLConfiguration(css_class).output_format == "pretty"
+
+
+def test_minify_chunks():
+    html = (
+        "<div>\n  <p>Some   <em>inline</em>\n  <b>text</b> </p>\n"
+        "<pre>  keep\n   this </pre><!-- comment -->\n</div>"
+    )
+    expected = (
+        "<div><p>Some <em>inline</em> <b>text</b></p><pre>  keep\n   this </pre></div>"
+    )
+    assert "".join(minify([html])) == expected
+    assert "".join(minify(html)) == expected
+
+
+def test_jinja_env(
+    calendar: MasterCalendar, tmp_path: pathlib.Path, template_dir: pathlib.Path
+):
+    assert get_jinja_env(template_dir) is calendar.env
+    assert calendar.templates["week"] is calendar.env.get_template("week.html.j2")
+    env = init_jinja_env(template_dir, tmp_path / "cache")
+    env.get_template("week.html.j2")
+    assert list((tmp_path / "cache").iterdir())
+
+
+def test_feature_matrix(calendar: MasterCalendar):
+    matrix = calendar.feature_matrix()
+    assert matrix is calendar.feature_matrix()
+    for day in date_range(date(2026, 1, 1), date(2026, 12, 31)):
+        assert matrix.row(day) == [
+            (feat.format_attrs(day), feat.format_text(day).strip())
+            for feat in calendar.features
+        ]
+
+
+def test_render_parallel(calendar: MasterCalendar):
+    html = calendar.render()
+    assert calendar.render(parallel=3) == html
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        calendar.render_months(executor, 4)
+    assert calendar.render() == html
+    assert pickle.loads(pickle.dumps(calendar)).render() == html
@@ -0,0 +1,57 @@
+import os
+import pathlib
+import re
+import subprocess
+import sys
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent
+
+# Imported only when rendering, parsing configuration files or converting comments.
+HEAVY_MODULES = ["bs4", "concurrent.futures", "jinja2", "markdown", "yaml"]
+
+# Import time budget of the modules needed to start the command line, in µs.
+IMPORT_TIME_BUDGET = 100_000
+
+_IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def import_times(statement: str, pycache_dir: pathlib.Path) -> dict[str, int]:
+    """Returns the cumulative import time of the top-level modules, in µs."""
+    command = [
+        sys.executable,
+        "-X",
+        "importtime",
+        "-X",
+        f"pycache_prefix={pycache_dir}",
+        "-c",
+        statement,
+    ]
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key != "PYTHONDONTWRITEBYTECODE"
+    }
+    # The first run compiles the modules, the second one measures the imports.
+    subprocess.run(command, cwd=ROOT_DIR, env=env, check=True, capture_output=True)
+    process = subprocess.run(
+        command, cwd=ROOT_DIR, env=env, check=True, capture_output=True, text=True
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            _, cumulative, indent, module = match.groups()
+            times[module] = int(cumulative) if not indent else 0
+    return times
+
+
+def test_import_time(tmp_path: pathlib.Path):
+    startup = import_times("pass", tmp_path)
+    times = import_times(
+        "import kaloot; kaloot.html.OUTPUT_FORMATS; kaloot.io", tmp_path
+    )
+    assert "kaloot.feature" in times
+    for module in HEAVY_MODULES:
+        assert module not in times
+    total = sum(time for module, time in times.items() if module not in startup)
+    assert total < IMPORT_TIME_BUDGET
@@ -0,0 +1,62 @@
+import kaloot.io
+from kaloot.io import markdown_to_html, read_configuration_file, write_html
+
+import pathlib
+from typing import Callable
+
+import pytest
+
+
+def test_configuration_cache(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    write_config: Callable[..., pathlib.Path],
+):
+    comments = tmp_path / "comments.md"
+    comments.write_text("Some *comments*.\n", encoding="utf-8")
+    config_path = write_config(
+        comments=comments, extra="custody_overrides:\n  25/12: B\n"
+    )
+    cache_dir = tmp_path / "cache"
+
+    expected = read_configuration_file(config_path)
+    assert read_configuration_file(config_path, cache_dir) == expected
+    assert len(list((cache_dir / "config").iterdir())) == 1
+
+    parse_configuration = kaloot.io.parse_configuration
+    monkeypatch.setattr(kaloot.io, "parse_configuration", None)
+    config = read_configuration_file(config_path, cache_dir)
+    assert config == expected
+    assert config.public_holidays.dates is expected.public_holidays.dates
+
+    # Changing the comments invalidates the cached configuration.
+    comments.write_text("Other *comments*.\n", encoding="utf-8")
+    with pytest.raises(TypeError):
+        read_configuration_file(config_path, cache_dir)
+    monkeypatch.setattr(kaloot.io, "parse_configuration", parse_configuration)
+    config = read_configuration_file(config_path, cache_dir)
+    assert "Other" in config.comments_html
+
+
+def test_markdown_to_html():
+    markdown = pytest.importorskip("markdown")
+    texts = ["Some *comments*.\n", "# Title\n\n- a\n- b\n", "Some *comments*.\n"]
+    markdown_to_html.cache_clear()
+    for text in texts:
+        assert markdown_to_html(text) == markdown.markdown(text)
+    assert markdown_to_html.cache_info().hits == 1
+
+
+def test_write_html_keeps_previous(tmp_path: pathlib.Path):
+    def chunks():
+        yield "<html>"
+        raise RuntimeError("template error")
+
+    path = tmp_path / "calendar.html"
+    write_html(path, ["<html>", "</html>"])
+    assert path.read_text(encoding="utf-8") == "<html></html>"
+
+    with pytest.raises(RuntimeError):
+        write_html(path, chunks())
+    assert path.read_text(encoding="utf-8") == "<html></html>"
+    assert [file.name for file in tmp_path.iterdir()] == ["calendar.html"]
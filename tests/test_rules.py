@@ -0,0 +1,161 @@
+from kaloot.custody import (
+    get_guardian,
+    get_guardian_scheduled,
+    solve_year,
+    update_year,
+)
+from kaloot.date import date, date_collection, date_range
+from kaloot.io import parse_configuration
+from kaloot.rules import CustodyRules
+
+import pathlib
+from typing import Callable
+
+from hypothesis import given, settings
+import pytest
+from hypothesis.strategies import composite, integers, lists, SearchStrategy
+
+ALTERNATE_RULES = """
+custody_rules:
+  weeks:
+    even: [B->L, L, L, L, L, L, L]
+    odd: [L->B, B, B, B, B, B, B]
+"""
+
+OTHER_GUARDIANS = """
+custody_rules:
+  guardians: [A, C]
+  weeks:
+    even: [C->A, A, A, A, A, A, A]
+    odd: [A->C, C, C, C, C, C, C]
+  before_holidays: {even: A, odd: C}
+  holidays:
+    first: {even_year: A, odd_year: C}
+  special_days: {fathers_day: A, mothers_day: C}
+"""
+
+ALTERNATE_WEEKS = {
+    "weeks": {
+        "even": ["B->L", "L", "L", "L", "L", "L", "L"],
+        "odd": ["L->B", "B", "B", "B", "B", "B", "B"],
+    },
+    "holidays": {"first": {"even_year": "B"}, "summer_transition": "first_saturday"},
+    "special_days": {"mothers_day": None},
+}
+
+
+@composite
+def school_holidays(
+    draw: Callable[SearchStrategy[int], int],
+) -> tuple[int, date_collection]:
+    """Returns a year and holidays around it, overlapping ranges included."""
+    year = draw(integers(min_value=2021, max_value=2040))
+    lengths = draw(lists(integers(min_value=1, max_value=60), min_size=1, max_size=8))
+    gaps = draw(lists(integers(min_value=-20, max_value=60), min_size=8, max_size=8))
+    holidays = date_collection()
+    start = date(year - 1, 12, 10)
+    for length, gap in zip(lengths, gaps):
+        end = start + length
+        holidays.add_range(date_range(start, end))
+        start = end + gap
+    return year, holidays
+
+
+@settings(max_examples=30, deadline=None)
+@given(school_holidays())
+def test_default_rules(year_holidays: tuple[int, date_collection]):
+    year, holidays = year_holidays
+    overrides = {date(year, 12, 25): "B", date(year, 7, 14): "L→B"}
+    rules = CustodyRules().compile()
+    assert rules.solve_year(year, holidays, overrides) == solve_year(
+        year, holidays, overrides
+    )
+    for day in date_range(date(year - 1, 12, 1), date(year, 1, 31)):
+        assert rules.scheduled_guardian(day, holidays) == get_guardian_scheduled(
+            day, holidays
+        )
+        assert rules.guardian(day, holidays, overrides) == get_guardian(
+            day, holidays, overrides
+        )
+
+
+def test_alternate_weeks():
+    rules = CustodyRules.from_dict(ALTERNATE_WEEKS)
+    assert rules.even_week[0] == "B→L"
+    assert rules.mothers_day is None
+    holidays = date_collection()
+    holidays.add_range(date_range.from_string("17/10 - 01/11", 2026))
+    timeline = solve_year(2026, holidays, rules=rules)
+
+    # Week 2 is even, week 3 is odd.
+    assert timeline[date(2026, 1, 5)] == "B→L"
+    assert timeline[date(2026, 1, 11)] == "L"
+    assert timeline[date(2026, 1, 12)] == "L→B"
+    assert timeline[date(2026, 5, 31)] == "L"  # Mother's day, week 22
+    assert timeline[date(2026, 6, 21)] == "B"  # Father's day
+
+    # Holidays start in week 42, on the even week, given to B by the rules.
+    assert timeline[date(2026, 10, 16)] == "L→B"
+    assert timeline[date(2026, 10, 23)] == "B"
+    assert timeline[date(2026, 10, 24)] == "B→L"
+    assert timeline[date(2026, 11, 1)] == "L"
+
+    new_holidays = date_collection()
+    new_holidays.add_range(date_range.from_string("24/10 - 08/11", 2026))
+    update = update_year(timeline, holidays, new_holidays, rules=rules)
+    assert update.timeline == solve_year(2026, new_holidays, rules=rules)
+
+
+def test_from_dict():
+    assert CustodyRules.from_dict({}) == CustodyRules()
+    assert CustodyRules.from_dict({"guardians": ["L", "B"]}).guardians == ("L", "B")
+    assert CustodyRules.from_dict(ALTERNATE_WEEKS).compile() is (
+        CustodyRules.from_dict(ALTERNATE_WEEKS).compile()
+    )
+    errors = [
+        {"weeks": {"even": ["B"] * 6}},
+        {"weeks": {"odd": ["B"] * 6 + ["X"]}},
+        {"weeks": "alternate"},
+        {"guardians": ["B", "B"]},
+        {"before_holidays": {"even": "B→L"}},
+        {"holidays": {"transition": "sunday"}},
+        {"holidays": {"summer_months": [13]}},
+        {"special_days": {"fathers_day": "X"}},
+    ]
+    for data in errors:
+        with pytest.raises(ValueError, match="custody_rules"):
+            CustodyRules.from_dict(data)
+
+    unknown_keys = [
+        ({"week": ALTERNATE_WEEKS["weeks"]}, "'week'"),
+        ({"weeks": {"even": ["B"] * 7, "impair": ["L"] * 7}}, "weeks: unknown key"),
+        ({"holidays": {"first": {"even": "B"}}}, "holidays: first: unknown key 'even'"),
+        ({"special_days": {"fathersday": "B"}}, "'fathersday'"),
+    ]
+    for data, message in unknown_keys:
+        with pytest.raises(ValueError, match=message):
+            CustodyRules.from_dict(data)
+
+
+def test_parse_configuration(write_config: Callable[..., pathlib.Path]):
+    data = write_config().read_text(encoding="utf-8")
+    config = parse_configuration(data + ALTERNATE_RULES)
+    assert config.custody_rules.odd_week == ("L→B",) + ("B",) * 6
+    assert config.custody_rules.guardians == ("B", "L")
+    assert config.custody_rules.fathers_day == "B"
+    assert parse_configuration(data).custody_rules == CustodyRules()
+
+
+def test_parse_custody_overrides(write_config: Callable[..., pathlib.Path]):
+    data = write_config().read_text(encoding="utf-8")
+    config = parse_configuration(data + "custody_overrides:\n  25/12: B->L\n")
+    assert config.custody_overrides == {date(2026, 12, 25): "B→L"}
+    for guardian in ["BL", "X", "B→B", "[B]"]:
+        with pytest.raises(ValueError, match="custody_overrides: 25/12"):
+            parse_configuration(data + f"custody_overrides:\n  25/12: {guardian}\n")
+
+    data += OTHER_GUARDIANS
+    config = parse_configuration(data + "custody_overrides:\n  25/12: A\n")
+    assert config.custody_overrides == {date(2026, 12, 25): "A"}
+    with pytest.raises(ValueError, match="invalid guardian 'B'"):
+        parse_configuration(data + "custody_overrides:\n  25/12: B\n")
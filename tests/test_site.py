@@ -0,0 +1,58 @@
+from kaloot.html import create_calendar
+from kaloot.io import read_configuration_file
+from kaloot.site import (
+    build_site,
+    find_configuration_files,
+    find_year_configuration_files,
+    parse_years,
+)
+
+import os
+import pathlib
+from typing import Callable
+
+import pytest
+
+
+@pytest.fixture
+def config_dir(
+    tmp_path: pathlib.Path, write_config: Callable[..., pathlib.Path]
+) -> pathlib.Path:
+    config_dir = tmp_path / "configs"
+    config_dir.mkdir()
+    comments = config_dir / "comments.md"
+    comments.write_text("Some *comments*.\n", encoding="utf-8")
+    for year in [2025, 2026]:
+        write_config(f"configs/config-{year}.yaml", year, comments)
+    (config_dir / "family.yaml").write_text("year: 2026\n", encoding="utf-8")
+    return config_dir
+
+
+def test_parse_years():
+    assert parse_years("2023-2025") == [2023, 2024, 2025]
+    assert parse_years("2027,2023-2024,2023") == [2023, 2024, 2027]
+
+
+def test_build_site(config_dir: pathlib.Path, tmp_path: pathlib.Path):
+    site_dir = tmp_path / "docs"
+    configs = find_configuration_files(config_dir)
+    assert sorted(configs) == [2025, 2026]
+
+    calendars = build_site(configs, site_dir, index_year=2025)
+    assert os.readlink(site_dir / "index.html") == "2025/index.html"
+    for year, calendar_path in calendars.items():
+        year_dir = site_dir / str(year)
+        assert calendar_path == year_dir / f"calendar-{year}.html"
+        assert os.readlink(year_dir / "index.html") == f"calendar-{year}.html"
+        assert (year_dir / "comments.md").exists()
+        expected = create_calendar(read_configuration_file(configs[year])).render()
+        assert (year_dir / "index.html").read_text(encoding="utf-8") == expected
+
+    # Rebuilding from the copied configuration files replaces the links.
+    (config_dir / "config-2025.yaml").unlink()
+    configs = find_year_configuration_files([2025, 2026], config_dir, site_dir)
+    assert configs[2025] == site_dir / "2025" / "config-2025.yaml"
+    build_site(configs, site_dir, index_year=2026)
+    assert os.readlink(site_dir / "index.html") == "2026/index.html"
+    with pytest.raises(FileNotFoundError):
+        find_year_configuration_files([2024], config_dir, site_dir)
@@ -0,0 +1,68 @@
+from kaloot.custody import get_guardian
+from kaloot.date import date, date_collection, date_range
+from kaloot.stats import compute_stats
+
+import json
+import pathlib
+import subprocess
+import sys
+from typing import Callable
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent
+
+
+def test_compute_stats():
+    holidays = date_collection()
+    for range_ in ["20/12/2025 - 04/01/2026", "04/07 - 31/08", "19/12 - 03/01/2027"]:
+        holidays.add_range(date_range.from_string(range_, 2026))
+    first, last = date(2026, 1, 1), date(2027, 6, 30)
+    report = compute_stats(first, last, holidays, {date(2026, 12, 25): "B"})
+
+    days = (last - first).days + 1
+    assert report.total.total == days
+    assert sum(stats.total for stats in report.years.values()) == days
+    assert sum(stats.total for stats in report.months.values()) == days
+    assert report.total.handovers == sum(
+        "→" in get_guardian(day, holidays, {date(2026, 12, 25): "B"})
+        for day in date_range(first, last)
+    )
+    assert sorted(report.years) == [2026, 2027]
+    assert len(report.months) == 18
+
+    summer = report.holidays[date(2026, 7, 4), date(2026, 8, 31)]
+    assert summer.days == {"L": 29, "B": 30}
+    assert summer.handovers == 2
+    assert (date(2026, 1, 1), date(2026, 1, 4)) in report.holidays
+    assert sum(report.total.balance().values()) == 1
+
+    data = json.loads(json.dumps(report.to_dict()))
+    assert data["months"]["2026-07"]["days"] == report.months[2026, 7].days
+    table = report.format_table().splitlines()
+    assert table[0].split() == ["B", "L", "handovers"]
+    assert "04/07/2026 - 31/08/2026" in report.format_table()
+
+
+def test_stats_command_line(write_config: Callable[..., pathlib.Path]):
+    config_path = write_config()
+    command = [sys.executable, str(ROOT_DIR / "make-calendar.py")]
+
+    # The flag comes before or after the configuration file.
+    for args in [["--stats", config_path], [config_path, "--stats"]]:
+        process = subprocess.run(
+            command + args, check=True, capture_output=True, text=True
+        )
+        assert process.stdout.startswith(f"{config_path}:")
+
+    process = subprocess.run(
+        command + ["--stats", "--stats-format", "json", config_path],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    data = json.loads(process.stdout)
+    assert sum(data[str(config_path)]["total"]["days"].values()) == 365
+
+    process = subprocess.run(
+        command + ["--stats-format", "json", config_path], capture_output=True
+    )
+    assert process.returncode == 2
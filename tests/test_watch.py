@@ -0,0 +1,131 @@
+import kaloot.io
+import kaloot.watch
+from kaloot.io import read_configuration_file
+from kaloot.watch import COMMENTS, CONFIG, TEMPLATES, Watcher
+
+import os
+import pathlib
+import shutil
+from typing import Callable
+
+import pytest
+
+
+def touch(path: pathlib.Path, text: str):
+    """Writes a file and moves its modification time forward."""
+    mtime = os.stat(path).st_mtime_ns + 10**9
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_watcher(
+    tmp_path: pathlib.Path,
+    template_dir: pathlib.Path,
+    write_config: Callable[..., pathlib.Path],
+):
+    templates = tmp_path / "templates"
+    shutil.copytree(template_dir, templates)
+    comments = tmp_path / "comments.md"
+    comments.write_text("First *comments*.\n", encoding="utf-8")
+    config_path = write_config(comments=comments, templates=templates)
+    output_path = tmp_path / "calendar.html"
+    watcher = Watcher(config_path, output_path, log=lambda message: None)
+
+    watcher.run(max_builds=1)
+    assert "<em>comments</em>" in output_path.read_text(encoding="utf-8")
+    assert watcher.changes() == set()
+
+    config = watcher.config
+    touch(comments, "Second **comments**.\n")
+    assert watcher.changes() == {COMMENTS}
+    watcher.build({COMMENTS})
+    assert watcher.config.school_holidays is config.school_holidays
+    assert "<strong>comments</strong>" in output_path.read_text(encoding="utf-8")
+
+    legend = templates / "legend.html.j2"
+    touch(legend, legend.read_text(encoding="utf-8").replace("<td>", "<td><b>"))
+    assert watcher.changes() == {TEMPLATES}
+    watcher.build({TEMPLATES})
+    assert "<td><b>Vacances scolaires" in output_path.read_text(encoding="utf-8")
+
+    touch(
+        config_path, config_path.read_text(encoding="utf-8") + "    - 17/10 - 01/11\n"
+    )
+    assert watcher.changes() == {CONFIG}
+    watcher.build({CONFIG})
+    assert len(watcher.config.school_holidays.dates.ranges) == 3
+    assert watcher.builds == 4
+    assert [path.name for path in tmp_path.glob("*.tmp")] == []
+
+
+def test_watcher_change_during_build(
+    tmp_path: pathlib.Path, write_config: Callable[..., pathlib.Path]
+):
+    comments = tmp_path / "comments.md"
+    comments.write_text("First *comments*.\n", encoding="utf-8")
+    config_path = write_config(comments=comments)
+    output_path = tmp_path / "calendar.html"
+    watcher = Watcher(config_path, output_path, debounce=0, log=lambda message: None)
+
+    builds = []
+    build, wait_for_changes = watcher.build, watcher.wait_for_changes
+
+    def build_and_edit(changed: set[str]):
+        builds.append(changed)
+        build(changed)
+        if len(builds) == 1:
+            text = config_path.read_text(encoding="utf-8")
+            touch(config_path, text + "    - 17/10 - 01/11\n")
+
+    def wait_for_pending(pending: set[str]) -> set[str]:
+        assert pending == {CONFIG}
+        return wait_for_changes(pending)
+
+    watcher.build = build_and_edit
+    watcher.wait_for_changes = wait_for_pending
+    watcher.run(max_builds=2)
+    assert builds == [{CONFIG}, {CONFIG}]
+    assert len(watcher.config.school_holidays.dates.ranges) == 3
+
+
+def test_watcher_options(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    write_config: Callable[..., pathlib.Path],
+):
+    config_path = write_config()
+    text = config_path.read_text(encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    config = read_configuration_file(config_path, cache_dir)
+    messages = []
+    watcher = Watcher(
+        config_path,
+        tmp_path / "calendar.html",
+        log=messages.append,
+        jobs=2,
+        cache_dir=cache_dir,
+        config=config,
+    )
+
+    # The configuration already read is not read again.
+    read = kaloot.watch.read_configuration_file
+    monkeypatch.setattr(kaloot.watch, "read_configuration_file", None)
+    watcher.run(max_builds=1)
+    assert watcher.config is config
+    assert messages[-1].startswith("Wrote calendar")
+    monkeypatch.setattr(kaloot.watch, "read_configuration_file", read)
+
+    # Errors are logged, then the next change is built, from the cached
+    # configuration.
+    monkeypatch.setattr(kaloot.io, "parse_configuration", None)
+    touch(config_path, "year: 2026\n")
+
+    def fix_config(pending: set[str]) -> set[str]:
+        touch(config_path, text)
+        return watcher.changes() | pending
+
+    watcher.wait_for_changes = fix_config
+    watcher.run(max_builds=2)
+    assert messages[1].startswith(f"{config_path}: TypeError")
+    assert messages[2].startswith("Wrote calendar")
+    assert watcher.config == config